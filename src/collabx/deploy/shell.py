@@ -12,9 +12,26 @@ class CmdResult:
     err: str
 
 
-def run(cmd: List[str], cwd: Optional[str] = None, check: bool = True) -> CmdResult:
-    p = subprocess.run(cmd, cwd=cwd, capture_output=True, text=True)
-    res = CmdResult(code=p.returncode, out=(p.stdout or "").strip(), err=(p.stderr or "").strip())
+def _decode(data: Optional[bytes]) -> str:
+    return (data or b"").decode("utf-8", "replace").strip()
+
+
+def run(
+    cmd: List[str],
+    cwd: Optional[str] = None,
+    check: bool = True,
+    capture_stderr: bool = True,
+) -> CmdResult:
+    # Capture raw bytes and decode once at the end; stderr can be discarded
+    # for noisy best-effort commands whose output is never read.
+    p = subprocess.run(
+        cmd,
+        cwd=cwd,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE if capture_stderr else subprocess.DEVNULL,
+        bufsize=-1,
+    )
+    res = CmdResult(code=p.returncode, out=_decode(p.stdout), err=_decode(p.stderr))
     if check and p.returncode != 0:
         raise RuntimeError(f"command failed ({p.returncode}): {' '.join(cmd)}\n{res.err or res.out}")
     return res
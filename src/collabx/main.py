@@ -1,20 +1,31 @@
 from __future__ import annotations
 
+import functools
 import os
 import re
 import secrets
-import json
-from typing import Optional
+from typing import TYPE_CHECKING, Optional
 
 import typer
-from rich.console import Console
 
 from collabx.state import TargetState, load_state, save_state, clear_state, DEFAULT_STATE_PATH
-from collabx.stream import poll_logs, stream_sse
-from collabx.providers.gcp_cloudrun import gcp_up, gcp_down, gcp_status
+
+if TYPE_CHECKING:
+    from rich.console import Console
 
 app = typer.Typer(add_completion=False, no_args_is_help=True)
-console = Console()
+
+_HEX_RE = re.compile(r"[0-9a-fA-F]{16,}")
+_BRACKET_RE = re.compile(r"[<>]")
+
+
+# rich, httpx and the provider modules are imported lazily so that `--help`
+# and trivial commands don't pay for them.
+@functools.lru_cache(maxsize=None)
+def _console() -> Console:
+    from rich.console import Console
+
+    return Console()
 
 
 def _normalize_token(token: str) -> str:
@@ -22,22 +33,22 @@ def _normalize_token(token: str) -> str:
     if not t:
         return ""
     if t.startswith("<") and t.endswith(">") and len(t) > 2:
-        console.print("[yellow]Warning:[/yellow] token looked like a placeholder with <...>. Stripping brackets.")
+        _console().print("[yellow]Warning:[/yellow] token looked like a placeholder with <...>. Stripping brackets.")
         t = t[1:-1].strip()
-    if "<" in t or ">" in t:
-        console.print("[yellow]Warning:[/yellow] token contains '<' or '>' characters. Did you paste a placeholder?")
+    if _BRACKET_RE.search(t):
+        _console().print("[yellow]Warning:[/yellow] token contains '<' or '>' characters. Did you paste a placeholder?")
     return t
 
 
 def _warn_if_non_hex(token: str) -> None:
-    if token and not re.fullmatch(r"[0-9a-fA-F]{16,}", token):
-        console.print("[yellow]Note:[/yellow] token is not hex. That's OK if intentional, but double-check it.")
+    if token and not _HEX_RE.fullmatch(token):
+        _console().print("[yellow]Note:[/yellow] token is not hex. That's OK if intentional, but double-check it.")
 
 
 @app.command("gen-token")
 def gen_token(length: int = typer.Option(32, help="Token length in bytes (encoded as hex).")):
     token = secrets.token_hex(max(16, int(length)))
-    console.print(token)
+    _console().print(token)
 
 
 @app.command("init")
@@ -48,15 +59,18 @@ def init(
     token = secrets.token_hex(max(16, int(length)))
     base = url.rstrip("/")
     save_state(TargetState(base_url=base, token=token, provider="local", resources={}))
-    console.print("[green]initialized[/green]")
-    console.print(f"state:    {DEFAULT_STATE_PATH}")
-    console.print(f"base_url: {base}")
-    console.print(f"token:    {token}")
-    console.print("")
-    console.print("[bold]Endpoints:[/bold]")
-    console.print(f"collector: {base}/{token}/c")
-    console.print(f"logs:      {base}/{token}/logs")
-    console.print(f"events:    {base}/{token}/events")
+    lines = [
+        "[green]initialized[/green]",
+        f"state:    {DEFAULT_STATE_PATH}",
+        f"base_url: {base}",
+        f"token:    {token}",
+        "",
+        "[bold]Endpoints:[/bold]",
+        f"collector: {base}/{token}/c",
+        f"logs:      {base}/{token}/logs",
+        f"events:    {base}/{token}/events",
+    ]
+    _console().print("\n".join(lines))
 
 
 @app.command("env")
@@ -65,18 +79,22 @@ def env(
 ):
     st = load_state()
     if not st:
-        console.print("[yellow]No target set.[/yellow] Use: collabx up  OR  collabx init/target set")
+        _console().print("[yellow]No target set.[/yellow] Use: collabx up  OR  collabx init/target set")
         raise typer.Exit(code=1)
 
     if print_token:
-        console.print(st.token)
+        # Plain print: scripts capture this with $(collabx env --print-token).
+        print(st.token)
         return
 
-    console.print(f"export COLLABX_URL='{st.base_url}'")
-    console.print(f"export TOKEN='{st.token}'")
-    console.print(f"# collector: {st.collector_url}")
-    console.print(f"# logs:      {st.logs_url}")
-    console.print(f"# events:    {st.events_url}")
+    lines = [
+        f"export COLLABX_URL='{st.base_url}'",
+        f"export TOKEN='{st.token}'",
+        f"# collector: {st.collector_url}",
+        f"# logs:      {st.logs_url}",
+        f"# events:    {st.events_url}",
+    ]
+    _console().print("\n".join(lines))
 
 
 target_app = typer.Typer(add_completion=False, no_args_is_help=True)
@@ -92,34 +110,40 @@ def target_set(
     t = _normalize_token(token)
 
     if not base:
-        console.print("[red]url is empty[/red]")
+        _console().print("[red]url is empty[/red]")
         raise typer.Exit(code=1)
 
     if not t:
-        console.print("[red]token is empty[/red] — paste the token or run: collabx init")
+        _console().print("[red]token is empty[/red] — paste the token or run: collabx init")
         raise typer.Exit(code=1)
 
     _warn_if_non_hex(t)
 
     save_state(TargetState(base_url=base, token=t, provider="manual", resources={}))
-    console.print("[green]saved[/green]")
-    console.print(f"collector: {base}/{t}/c")
-    console.print(f"logs:      {base}/{t}/logs")
-    console.print(f"events:    {base}/{t}/events")
+    lines = [
+        "[green]saved[/green]",
+        f"collector: {base}/{t}/c",
+        f"logs:      {base}/{t}/logs",
+        f"events:    {base}/{t}/events",
+    ]
+    _console().print("\n".join(lines))
 
 
 @target_app.command("show")
 def target_show():
     st = load_state()
     if not st:
-        console.print("[yellow]No target set.[/yellow] Use: collabx up  OR  collabx init/target set")
+        _console().print("[yellow]No target set.[/yellow] Use: collabx up  OR  collabx init/target set")
         raise typer.Exit(code=1)
-    console.print(f"provider:  {st.provider}")
-    console.print(f"base_url:  {st.base_url}")
-    console.print(f"token:     {st.token}")
-    console.print(f"collector: {st.collector_url}")
-    console.print(f"logs:      {st.logs_url}")
-    console.print(f"events:    {st.events_url}")
+    lines = [
+        f"provider:  {st.provider}",
+        f"base_url:  {st.base_url}",
+        f"token:     {st.token}",
+        f"collector: {st.collector_url}",
+        f"logs:      {st.logs_url}",
+        f"events:    {st.events_url}",
+    ]
+    _console().print("\n".join(lines))
 
 
 @app.command("listen")
@@ -128,15 +152,17 @@ def listen(
     interval: float = typer.Option(5.0, help="Polling interval seconds (poll mode)."),
     limit: int = typer.Option(50, help="Max events per poll (1-200)."),
     after_id: int = typer.Option(0, help="Start cursor (event id)."),
-    json_mode: bool = typer.Option(False, "--json", help="Print each event as raw JSON."),
+    json_mode: bool = typer.Option(False, "--json", help="Print each event as one line of raw JSON."),
 ):
     st = load_state()
     if not st:
-        console.print("[yellow]No target set.[/yellow] Use: collabx up  OR  collabx init/target set")
+        _console().print("[yellow]No target set.[/yellow] Use: collabx up  OR  collabx init/target set")
         raise typer.Exit(code=1)
 
+    from collabx.stream import poll_logs, stream_sse
+
     if mode == "poll":
-        console.print(f"Polling {st.logs_url} every {interval}s (Ctrl+C to stop)")
+        _console().print(f"Polling {st.logs_url} every {interval}s (Ctrl+C to stop)")
         try:
             poll_logs(
                 logs_url=st.logs_url,
@@ -146,17 +172,17 @@ def listen(
                 json_mode=json_mode,
             )
         except KeyboardInterrupt:
-            console.print("\n[cyan]stopped[/cyan]")
+            _console().print("\n[cyan]stopped[/cyan]")
         return
 
     if mode == "stream":
         try:
             stream_sse(events_url=st.events_url, json_mode=json_mode)
         except KeyboardInterrupt:
-            console.print("\n[cyan]stopped[/cyan]")
+            _console().print("\n[cyan]stopped[/cyan]")
         return
 
-    console.print("[red]mode must be 'poll' or 'stream'[/red]")
+    _console().print("[red]mode must be 'poll' or 'stream'[/red]")
     raise typer.Exit(code=2)
 
 
@@ -171,7 +197,7 @@ def serve(
 ):
     t = _normalize_token(token)
     if not t:
-        console.print("[red]token is empty[/red]")
+        _console().print("[red]token is empty[/red]")
         raise typer.Exit(code=1)
     _warn_if_non_hex(t)
 
@@ -186,12 +212,15 @@ def serve(
 
     if set_target:
         save_state(TargetState(base_url=base, token=t, provider="local", resources={}))
-        console.print(f"[green]saved target[/green] → {base} (state: {DEFAULT_STATE_PATH})")
+        _console().print(f"[green]saved target[/green] → {base} (state: {DEFAULT_STATE_PATH})")
 
-    console.print(f"Starting server on http://{host}:{port}")
-    console.print(f"Collector: {base}/{t}/c")
-    console.print(f"Logs:      {base}/{t}/logs")
-    console.print(f"Events:    {base}/{t}/events")
+    lines = [
+        f"Starting server on http://{host}:{port}",
+        f"Collector: {base}/{t}/c",
+        f"Logs:      {base}/{t}/logs",
+        f"Events:    {base}/{t}/events",
+    ]
+    _console().print("\n".join(lines))
 
     import uvicorn
     uvicorn.run("collabx_server.main:app", host=host, port=port, reload=False, log_level="info")
@@ -209,9 +238,11 @@ def up(
 ):
     provider = provider.lower().strip()
     if provider != "gcp":
-        console.print("[red]Only provider 'gcp' is implemented right now.[/red]")
+        _console().print("[red]Only provider 'gcp' is implemented right now.[/red]")
         raise typer.Exit(code=2)
 
+    from collabx.providers.gcp_cloudrun import gcp_up
+
     repo_root = os.getcwd()
     url, tkn, resources = gcp_up(
         repo_root=repo_root,
@@ -225,36 +256,44 @@ def up(
 
     save_state(TargetState(base_url=url, token=tkn, provider="gcp", resources=resources))
 
-    console.print("[green]deployed[/green]")
-    console.print(f"base_url:  {url}")
-    console.print(f"token:     {tkn}")
-    console.print(f"collector: {url}/{tkn}/c")
-    console.print(f"logs:      {url}/{tkn}/logs")
-    console.print(f"events:    {url}/{tkn}/events")
-    console.print("")
-    console.print("Tip: default listen mode is polling every 5s: [bold]collabx listen[/bold]")
-    console.print("Opt-in SSE streaming: [bold]collabx listen --mode stream[/bold]")
+    lines = [
+        "[green]deployed[/green]",
+        f"base_url:  {url}",
+        f"token:     {tkn}",
+        f"collector: {url}/{tkn}/c",
+        f"logs:      {url}/{tkn}/logs",
+        f"events:    {url}/{tkn}/events",
+        "",
+        "Tip: default listen mode is polling every 5s: [bold]collabx listen[/bold]",
+        "Opt-in SSE streaming: [bold]collabx listen --mode stream[/bold]",
+    ]
+    _console().print("\n".join(lines))
 
 
 @app.command("status")
 def status():
     st = load_state()
     if not st:
-        console.print("[yellow]No target set.[/yellow] Use: collabx up  OR  collabx init/target set")
+        _console().print("[yellow]No target set.[/yellow] Use: collabx up  OR  collabx init/target set")
         raise typer.Exit(code=1)
 
-    console.print(f"provider: {st.provider}")
-    console.print(f"base_url: {st.base_url}")
-    console.print(f"collector: {st.collector_url}")
+    lines = [
+        f"provider: {st.provider}",
+        f"base_url: {st.base_url}",
+        f"collector: {st.collector_url}",
+    ]
+    _console().print("\n".join(lines))
 
     if st.provider == "gcp":
+        from collabx.providers.gcp_cloudrun import gcp_status
+
         info = gcp_status(st.resources)
-        try:
-            console.print_json(data=json.loads(info["raw"]))
-        except Exception:
-            console.print(info["raw"])
+        if "data" in info:
+            _console().print_json(data=info["data"])
+        else:
+            _console().print(info["raw"])
     else:
-        console.print("[yellow]No provider status available for this target.[/yellow]")
+        _console().print("[yellow]No provider status available for this target.[/yellow]")
 
 
 @app.command("down")
@@ -264,18 +303,20 @@ def down(
 ):
     st = load_state()
     if not st:
-        console.print("[yellow]No target set.[/yellow]")
+        _console().print("[yellow]No target set.[/yellow]")
         raise typer.Exit(code=1)
 
     if st.provider == "gcp":
+        from collabx.providers.gcp_cloudrun import gcp_down
+
         gcp_down(st.resources, delete_image=delete_image)
-        console.print("[green]torn down[/green]")
+        _console().print("[green]torn down[/green]")
     else:
-        console.print("[yellow]Current target is not a cloud deployment.[/yellow] Nothing to tear down.")
+        _console().print("[yellow]Current target is not a cloud deployment.[/yellow] Nothing to tear down.")
 
     if clear:
         clear_state()
-        console.print(f"[green]state cleared[/green] ({DEFAULT_STATE_PATH})")
+        _console().print(f"[green]state cleared[/green] ({DEFAULT_STATE_PATH})")
 
 
 if __name__ == "__main__":
@@ -1,7 +1,13 @@
 from __future__ import annotations
 
+import configparser
+import functools
+import json
+import os
 import secrets
 import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
 from typing import Dict, Optional, Tuple
 
 from rich.console import Console
@@ -11,9 +17,31 @@ from collabx.deploy.shell import run
 console = Console()
 
 
+def _read_configured_project() -> Optional[str]:
+    """Read the active gcloud project from its config files without spawning gcloud."""
+    env_project = os.environ.get("CLOUDSDK_CORE_PROJECT")
+    if env_project:
+        return env_project
+    config_dir = Path(os.environ.get("CLOUDSDK_CONFIG") or "~/.config/gcloud").expanduser()
+    try:
+        active = os.environ.get("CLOUDSDK_ACTIVE_CONFIG_NAME")
+        if not active:
+            active = (config_dir / "active_config").read_text(encoding="utf-8").strip() or "default"
+        parser = configparser.ConfigParser()
+        parser.read_string((config_dir / "configurations" / f"config_{active}").read_text(encoding="utf-8"))
+    except (OSError, configparser.Error):
+        return None
+    return parser.get("core", "project", fallback="").strip() or None
+
+
+@functools.lru_cache(maxsize=1)
 def _get_project(explicit_project: Optional[str]) -> str:
     if explicit_project:
         return explicit_project
+    proj = _read_configured_project()
+    if proj:
+        return proj
+    # Fall back to asking gcloud (e.g. non-default config locations).
     r = run(["gcloud", "config", "get-value", "project"], check=True)
     proj = (r.out or "").strip()
     if not proj or proj == "(unset)":
@@ -35,6 +63,7 @@ def _ensure_services(project: str) -> None:
             "--quiet",
         ],
         check=False,
+        capture_stderr=False,
     )
 
 
@@ -54,12 +83,13 @@ def _ensure_repo(project: str, region: str, repo: str) -> None:
             "--quiet",
         ],
         check=False,
+        capture_stderr=False,
     )
 
 
 def _configure_docker_auth(region: str) -> None:
     host = f"{region}-docker.pkg.dev"
-    run(["gcloud", "auth", "configure-docker", host, "--quiet"], check=False)
+    run(["gcloud", "auth", "configure-docker", host, "--quiet"], check=False, capture_stderr=False)
 
 
 def _build_and_push(project: str, region: str, repo: str, image_name: str, tag: str, cwd: str) -> str:
@@ -123,9 +153,17 @@ def gcp_up(
     token: Optional[str] = None,
 ) -> Tuple[str, str, Dict]:
     project_id = _get_project(project)
-    _ensure_services(project_id)
-    _ensure_repo(project_id, region, repo)
-    _configure_docker_auth(region)
+
+    def _ensure_services_and_repo() -> None:
+        # The repo can only be created once the Artifact Registry API is enabled.
+        _ensure_services(project_id)
+        _ensure_repo(project_id, region, repo)
+
+    # Docker auth is local-only, so it can overlap with the project setup calls.
+    with ThreadPoolExecutor(max_workers=2) as ex:
+        futs = [ex.submit(_ensure_services_and_repo), ex.submit(_configure_docker_auth, region)]
+        for f in futs:
+            f.result()
 
     if not token:
         token = secrets.token_hex(32)
@@ -168,7 +206,10 @@ def gcp_status(resources: Dict) -> Dict:
         ],
         check=True,
     )
-    return {"raw": r.out}
+    try:
+        return {"data": json.loads(r.out)}
+    except ValueError:
+        return {"raw": r.out}
 
 
 def gcp_down(resources: Dict, delete_image: bool = True) -> None:
@@ -193,6 +234,7 @@ def gcp_down(resources: Dict, delete_image: bool = True) -> None:
                 "--quiet",
             ],
             check=False,
+            capture_stderr=False,
         )
     if delete_image and project and image_uri:
         console.print(f"[cyan]Deleting image[/cyan] {image_uri}")
@@ -208,4 +250,5 @@ def gcp_down(resources: Dict, delete_image: bool = True) -> None:
                 "--quiet",
             ],
             check=False,
+            capture_stderr=False,
         )
@@ -2,13 +2,17 @@ from __future__ import annotations
 
 import json
 import os
+import tempfile
 from dataclasses import dataclass
+from functools import cached_property
 from pathlib import Path
-from typing import Any, Dict, Optional
-
+from typing import Any, Dict, Optional, Tuple
 
 DEFAULT_STATE_PATH = Path.home() / ".collabx" / "state.json"
 
+# (path, st_mtime_ns, state) of the last successful load_state().
+_CACHE: Optional[Tuple[Path, int, "TargetState"]] = None
+
 
 @dataclass
 class TargetState:
@@ -21,28 +25,39 @@ class TargetState:
         if self.resources is None:
             self.resources = {}
 
-    @property
+    # URLs are derived once per instance; state is not mutated after construction.
+    @cached_property
+    def _token_prefix(self) -> str:
+        return f"{self.base_url.rstrip('/')}/{self.token}"
+
+    @cached_property
     def collector_url(self) -> str:
-        return f"{self.base_url.rstrip('/')}/{self.token}/c"
+        return f"{self._token_prefix}/c"
 
-    @property
+    @cached_property
     def logs_url(self) -> str:
-        return f"{self.base_url.rstrip('/')}/{self.token}/logs"
+        return f"{self._token_prefix}/logs"
 
-    @property
+    @cached_property
     def events_url(self) -> str:
-        return f"{self.base_url.rstrip('/')}/{self.token}/events"
+        return f"{self._token_prefix}/events"
 
 
 def load_state(path: Path = DEFAULT_STATE_PATH) -> Optional[TargetState]:
+    global _CACHE
     try:
+        mtime_ns = path.stat().st_mtime_ns
+        if _CACHE and _CACHE[0] == path and _CACHE[1] == mtime_ns:
+            return _CACHE[2]
         data = json.loads(path.read_text(encoding="utf-8"))
-        return TargetState(
+        state = TargetState(
             base_url=data["base_url"],
             token=data["token"],
             provider=data.get("provider", "local"),
             resources=data.get("resources") or {},
         )
+        _CACHE = (path, mtime_ns, state)
+        return state
     except FileNotFoundError:
         return None
     except Exception:
@@ -50,19 +65,44 @@ def load_state(path: Path = DEFAULT_STATE_PATH) -> Optional[TargetState]:
 
 
 def save_state(state: TargetState, path: Path = DEFAULT_STATE_PATH) -> None:
+    """Write state to disk atomically.
+
+    The payload goes to a private temp file in the same directory, is fsynced
+    and then renamed over the target, so a concurrent load_state() or a crash
+    mid-write sees either the old state or the new one, never a partial file.
+    Losing the file would lose the GCP resources `collabx down` tears down.
+    """
+    global _CACHE
+    _CACHE = None
     path.parent.mkdir(parents=True, exist_ok=True)
-    tmp = path.with_suffix(".tmp")
     payload = {
         "base_url": state.base_url,
         "token": state.token,
         "provider": state.provider,
         "resources": state.resources or {},
     }
-    tmp.write_text(json.dumps(payload, indent=2), encoding="utf-8")
-    os.replace(tmp, path)
+    data = json.dumps(payload, indent=2).encode("utf-8")
+
+    # mkstemp gives each writer its own 0600 temp file, so concurrent saves
+    # can't clobber each other's half-written data.
+    fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=path.name, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, path)
+    except BaseException:
+        try:
+            os.unlink(tmp)
+        except FileNotFoundError:
+            pass
+        raise
 
 
 def clear_state(path: Path = DEFAULT_STATE_PATH) -> None:
+    global _CACHE
+    _CACHE = None
     try:
         path.unlink()
     except FileNotFoundError:
@@ -1,8 +1,10 @@
 from __future__ import annotations
 
 import json
-import time
-from typing import Optional
+import sys
+import threading
+from typing import Iterable, Iterator, Optional, Tuple
+from urllib.parse import urlencode
 
 import httpx
 from rich.console import Console
@@ -10,30 +12,89 @@ from rich.table import Table
 
 console = Console()
 
+# Idle polls back off exponentially up to this many seconds.
+MAX_POLL_INTERVAL_S = 30.0
+
+
+# (label, event key, only shown when non-empty, max length)
+_EVENT_FIELDS = (
+    ("id", "id", False, None),
+    ("time", "received_at", False, None),
+    ("method", "method", False, None),
+    ("path", "path", False, None),
+    ("query", "query", True, None),
+    ("client_ip", "client_ip", False, None),
+    ("ua", "user_agent", True, 200),
+    ("origin", "origin", True, 200),
+    ("referer", "referer", True, 200),
+)
+_SEPARATOR = "-" * 60
+
 
 def _render_event(e: dict) -> None:
+    rows = []
+    for label, key, optional, max_len in _EVENT_FIELDS:
+        value = e.get(key, "")
+        if optional and not value:
+            continue
+        rows.append((label, str(value)[:max_len]))
+
+    if not console.is_terminal:
+        # Piped output: skip Rich's table layout and markup parsing entirely.
+        if e.get("body_truncated"):
+            rows.append(("body", "truncated"))
+        lines = [f"{label:<10} {value}" for label, value in rows]
+        lines.append(_SEPARATOR)
+        console.file.write("\n".join(lines) + "\n")
+        return
+
     table = Table(show_header=False, box=None, pad_edge=False)
-    table.add_row("[bold]id[/bold]", str(e.get("id", "")))
-    table.add_row("[bold]time[/bold]", str(e.get("received_at", "")))
-    table.add_row("[bold]method[/bold]", str(e.get("method", "")))
-    table.add_row("[bold]path[/bold]", str(e.get("path", "")))
-    q = e.get("query", "")
-    if q:
-        table.add_row("[bold]query[/bold]", str(q))
-    table.add_row("[bold]client_ip[/bold]", str(e.get("client_ip", "")))
-    ua = e.get("user_agent", "")
-    if ua:
-        table.add_row("[bold]ua[/bold]", str(ua)[:200])
-    origin = e.get("origin", "")
-    if origin:
-        table.add_row("[bold]origin[/bold]", str(origin)[:200])
-    referer = e.get("referer", "")
-    if referer:
-        table.add_row("[bold]referer[/bold]", str(referer)[:200])
+    for label, value in rows:
+        table.add_row(f"[bold]{label}[/bold]", value)
     if e.get("body_truncated"):
         table.add_row("[bold]body[/bold]", "[yellow]truncated[/yellow]")
     console.print(table)
-    console.print("-" * 60)
+    console.print(_SEPARATOR)
+
+
+def _client(*, timeout: Optional[float], headers: Optional[dict] = None) -> httpx.Client:
+    """HTTP client that keeps a single connection alive across polls/reconnects.
+
+    HTTP/2 is negotiated via ALPN on https targets (e.g. Cloud Run); plain
+    http targets stay on HTTP/1.1. Failed connects are retried by the transport.
+    """
+    transport = httpx.HTTPTransport(
+        http2=True,
+        retries=3,
+        limits=httpx.Limits(max_keepalive_connections=1, keepalive_expiry=300),
+    )
+    return httpx.Client(transport=transport, timeout=timeout, follow_redirects=True, headers=headers)
+
+
+def _write_json_lines(lines: Iterable[bytes]) -> None:
+    """Write one JSON document per line straight to stdout (for `| jq`)."""
+    sys.stdout.flush()
+    out = sys.stdout.buffer
+    for line in lines:
+        out.write(line)
+        out.write(b"\n")
+    out.flush()
+
+
+def _fetch_logs_page(
+    client: httpx.Client, url: str, etag: Optional[str]
+) -> Tuple[Optional[dict], Optional[str]]:
+    """GET one /logs page, conditional on the ETag of the previous response.
+
+    Returns (payload, etag); payload is None when the server answered 304
+    (nothing new since the page that carried `etag`).
+    """
+    headers = {"If-None-Match": etag} if etag else None
+    r = client.get(url, headers=headers)
+    if r.status_code == 304:
+        return None, etag
+    r.raise_for_status()
+    return r.json(), r.headers.get("etag")
 
 
 def poll_logs(
@@ -46,52 +107,82 @@ def poll_logs(
     timeout_s: float = 10.0,
 ) -> None:
     after_id = max(0, int(start_after_id))
-    with httpx.Client(timeout=timeout_s, follow_redirects=True) as client:
+    base_interval = max(0.2, interval_s)
+    empty_streak = 0
+    etag: Optional[str] = None
+    waiter = threading.Event()
+    # Only after_id changes between polls, so the rest of the query is built once.
+    url_prefix = f"{logs_url}?{urlencode({'limit': limit})}&after_id="
+    with _client(timeout=timeout_s, headers={"Accept": "application/json"}) as client:
         while True:
             try:
-                r = client.get(logs_url, params={"after_id": after_id, "limit": limit})
-                r.raise_for_status()
-                payload = r.json()
-                events = payload.get("events", []) or []
-                next_after_id = int(payload.get("next_after_id", after_id))
+                payload, etag = _fetch_logs_page(client, url_prefix + str(after_id), etag)
+                if payload is None:
+                    events = []
+                else:
+                    events = payload.get("events", []) or []
+                    next_after_id = int(payload.get("next_after_id", after_id))
 
-                for e in events:
                     if json_mode:
-                        console.print_json(data=e)
+                        if events:
+                            _write_json_lines(
+                                json.dumps(e, ensure_ascii=False).encode("utf-8") for e in events
+                            )
                     else:
-                        _render_event(e)
-                after_id = max(after_id, next_after_id)
+                        for e in events:
+                            _render_event(e)
+                    after_id = max(after_id, next_after_id)
+                empty_streak = 0 if events else empty_streak + 1
             except KeyboardInterrupt:
                 raise
             except Exception as ex:
                 console.print(f"[red]poll error[/red]: {ex}")
-            time.sleep(max(0.2, interval_s))
+            # Back off while the target is idle; any new event resets to the base interval.
+            delay = base_interval * (2 ** min(empty_streak, 16))
+            waiter.wait(min(delay, max(base_interval, MAX_POLL_INTERVAL_S)))
+
+
+def _iter_sse_data(chunks: Iterable[bytes]) -> Iterator[bytes]:
+    """Yield the joined `data:` payload of each SSE event from raw byte chunks.
+
+    Lines are split once per chunk and scanned in a single pass; comments and
+    other fields are skipped.
+    """
+    pending = b""
+    data = bytearray()
+    has_data = False
+    for chunk in chunks:
+        lines = (pending + chunk).split(b"\n")
+        pending = lines.pop()
+        for line in lines:
+            if line.endswith(b"\r"):
+                line = line[:-1]
+            if not line:
+                if has_data:
+                    yield bytes(data)
+                    data.clear()
+                    has_data = False
+                continue
+            if line.startswith(b"data:"):
+                if has_data:
+                    data += b"\n"
+                value = line[5:]
+                data += value[1:] if value.startswith(b" ") else value
+                has_data = True
 
 
 def stream_sse(*, events_url: str, json_mode: bool = False) -> None:
     console.print(f"Streaming {events_url} (Ctrl+C to stop)")
-    with httpx.Client(timeout=None, follow_redirects=True) as client:
+    with _client(timeout=None) as client:
         with client.stream("GET", events_url, headers={"Accept": "text/event-stream"}) as r:
             r.raise_for_status()
-            buf = []
-            for line in r.iter_lines():
-                if line is None:
-                    continue
-                if line == "":
-                    data_lines = [l for l in buf if l.startswith("data:")]
-                    buf = []
-                    if not data_lines:
-                        continue
-                    data = "\n".join([l[5:].lstrip() for l in data_lines])
-                    try:
-                        evt = json.loads(data)
-                    except Exception:
-                        continue
-                    if json_mode:
-                        console.print_json(data=evt)
-                    else:
-                        _render_event(evt)
+            for data in _iter_sse_data(r.iter_bytes(chunk_size=8192)):
+                if json_mode:
+                    # The frame payload is already JSON; pass it through untouched.
+                    _write_json_lines((data,))
                     continue
-                if line.startswith(":"):
+                try:
+                    evt = json.loads(data)
+                except Exception:
                     continue
-                buf.append(line)
+                _render_event(evt)
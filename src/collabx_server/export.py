@@ -2,9 +2,35 @@
 from __future__ import annotations
 
 import csv
-import io
-import json
-from typing import Any
+from typing import Any, AsyncIterable, AsyncIterator, Iterable, Iterator
+
+import orjson
+
+# CSV columns; complex fields like headers are left out.
+CSV_FIELDNAMES = [
+    'id', 'received_at', 'method', 'path', 'query',
+    'client_ip', 'x_forwarded_for', 'x_real_ip',
+    'origin', 'referer', 'user_agent', 'content_type',
+    'body_truncated'
+]
+
+# Same columns as a table projection, for exporting straight from row tuples.
+CSV_COLUMNS = tuple(CSV_FIELDNAMES)
+_CSV_BODY_TRUNCATED = CSV_FIELDNAMES.index('body_truncated')
+
+
+# Streaming exports coalesce per-event output into chunks of about this size.
+STREAM_CHUNK_BYTES = 64 * 1024
+
+
+class _LineBuffer:
+    """Write target for csv.writer that keeps only the last written line."""
+
+    def __init__(self) -> None:
+        self.line = ""
+
+    def write(self, s: str) -> None:
+        self.line = s
 
 
 def export_to_json(events: list[dict[str, Any]]) -> str:
@@ -16,7 +42,30 @@ def export_to_json(events: list[dict[str, Any]]) -> str:
     Returns:
         JSON string representation
     """
-    return json.dumps(events, indent=2, ensure_ascii=False)
+    return orjson.dumps(events, option=orjson.OPT_INDENT_2).decode("utf-8")
+
+
+def iter_csv(events: Iterable[dict[str, Any]]) -> Iterator[str]:
+    """Yield CSV output one line at a time.
+    
+    Args:
+        events: Iterable of event dictionaries
+        
+    Yields:
+        The header line (only if there is at least one event), then one line per event
+    """
+    buf = _LineBuffer()
+    writer = csv.writer(buf)
+    header_written = False
+    
+    for event in events:
+        if not header_written:
+            writer.writerow(CSV_FIELDNAMES)
+            yield buf.line
+            header_written = True
+        # Project the fixed columns straight from the event; extra fields are ignored
+        writer.writerow([event.get(f, "") for f in CSV_FIELDNAMES])
+        yield buf.line
 
 
 def export_to_csv(events: list[dict[str, Any]]) -> str:
@@ -28,28 +77,24 @@ def export_to_csv(events: list[dict[str, Any]]) -> str:
     Returns:
         CSV string representation
     """
-    if not events:
-        return ""
-        
-    output = io.StringIO()
-    
-    # Define CSV columns
-    fieldnames = [
-        'id', 'received_at', 'method', 'path', 'query',
-        'client_ip', 'x_forwarded_for', 'x_real_ip',
-        'origin', 'referer', 'user_agent', 'content_type',
-        'body_truncated'
-    ]
-    
-    writer = csv.DictWriter(output, fieldnames=fieldnames, extrasaction='ignore')
-    writer.writeheader()
+    return "".join(iter_csv(events))
+
+
+def iter_ndjson(events: Iterable[dict[str, Any]]) -> Iterator[bytes]:
+    """Yield NDJSON output as UTF-8 byte chunks.
     
+    Args:
+        events: Iterable of event dictionaries
+        
+    Yields:
+        Encoded events separated by newline chunks
+    """
+    first = True
     for event in events:
-        # Flatten the event, excluding complex fields like headers
-        row = {k: v for k, v in event.items() if k in fieldnames}
-        writer.writerow(row)
-    
-    return output.getvalue()
+        if not first:
+            yield b"\n"
+        first = False
+        yield orjson.dumps(event)
 
 
 def export_to_ndjson(events: list[dict[str, Any]]) -> str:
@@ -61,5 +106,101 @@ def export_to_ndjson(events: list[dict[str, Any]]) -> str:
     Returns:
         NDJSON string representation
     """
-    lines = [json.dumps(event, ensure_ascii=False) for event in events]
-    return '\n'.join(lines)
+    return export_to_ndjson_bytes(events).decode("utf-8")
+
+
+def export_to_ndjson_bytes(events: list[dict[str, Any]]) -> bytes:
+    """Export events to NDJSON as UTF-8 bytes, ready for an HTTP response body.
+    
+    Args:
+        events: List of event dictionaries
+        
+    Returns:
+        NDJSON bytes representation
+    """
+    return b"".join(iter_ndjson(events))
+
+
+async def _coalesce(parts: AsyncIterator[bytes]) -> AsyncIterator[bytes]:
+    """Group small byte parts into chunks of roughly STREAM_CHUNK_BYTES."""
+    buf = bytearray()
+    async for part in parts:
+        buf += part
+        if len(buf) >= STREAM_CHUNK_BYTES:
+            yield bytes(buf)
+            buf.clear()
+    if buf:
+        yield bytes(buf)
+
+
+async def _json_parts(events: AsyncIterable[dict[str, Any]]) -> AsyncIterator[bytes]:
+    first = True
+    async for event in events:
+        # Re-indent each element by one level; JSON strings never contain raw
+        # newlines, so the output matches export_to_json byte for byte.
+        yield (b"[\n  " if first else b",\n  ") + orjson.dumps(
+            event, option=orjson.OPT_INDENT_2
+        ).replace(b"\n", b"\n  ")
+        first = False
+    yield b"[]" if first else b"\n]"
+
+
+async def _csv_row_parts(rows: AsyncIterable[tuple[Any, ...]]) -> AsyncIterator[bytes]:
+    buf = _LineBuffer()
+    writer = csv.writer(buf)
+    header_written = False
+    async for row in rows:
+        if not header_written:
+            writer.writerow(CSV_FIELDNAMES)
+            yield buf.line.encode("utf-8")
+            header_written = True
+        # body_truncated is stored as 0/1; write it as the bool events carry
+        row = list(row)
+        row[_CSV_BODY_TRUNCATED] = bool(row[_CSV_BODY_TRUNCATED])
+        writer.writerow(row)
+        yield buf.line.encode("utf-8")
+
+
+async def _ndjson_parts(events: AsyncIterable[dict[str, Any]]) -> AsyncIterator[bytes]:
+    first = True
+    async for event in events:
+        yield orjson.dumps(event) if first else b"\n" + orjson.dumps(event)
+        first = False
+
+
+def stream_json(events: AsyncIterable[dict[str, Any]]) -> AsyncIterator[bytes]:
+    """Stream the export_to_json output as UTF-8 byte chunks.
+    
+    Args:
+        events: Async iterable of event dictionaries
+        
+    Returns:
+        Async iterator of byte chunks
+    """
+    return _coalesce(_json_parts(events))
+
+
+def stream_ndjson(events: AsyncIterable[dict[str, Any]]) -> AsyncIterator[bytes]:
+    """Stream the export_to_ndjson output as UTF-8 byte chunks.
+    
+    Args:
+        events: Async iterable of event dictionaries
+        
+    Returns:
+        Async iterator of byte chunks
+    """
+    return _coalesce(_ndjson_parts(events))
+
+
+def stream_csv_rows(rows: AsyncIterable[tuple[Any, ...]]) -> AsyncIterator[bytes]:
+    """Stream CSV from row tuples in CSV_COLUMNS order, skipping event dicts.
+    
+    Produces the same bytes as export_to_csv over the equivalent events.
+    
+    Args:
+        rows: Async iterable of row tuples
+        
+    Returns:
+        Async iterator of byte chunks
+    """
+    return _coalesce(_csv_row_parts(rows))
@@ -1,18 +1,89 @@
 """Logging configuration for CollabX server."""
 from __future__ import annotations
 
+import functools
 import logging
+import logging.handlers
+import queue
 import sys
-from typing import Any
+import time
+from typing import Any, Optional
+
+LOG_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+
+
+@functools.lru_cache(maxsize=1)
+def _format_second(seconds: int) -> str:
+    return time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(seconds))
+
+
+class CachedTimeFormatter(logging.Formatter):
+    """Formatter that renders each wall-clock second only once.
+    
+    Records logged within the same second reuse the cached timestamp and
+    only append their milliseconds.
+    """
+
+    def formatTime(self, record: logging.LogRecord, datefmt: str | None = None) -> str:  # noqa: N802
+        if datefmt:
+            return super().formatTime(record, datefmt)
+        return f"{_format_second(int(record.created))},{int(record.msecs):03d}"
+
+
+def _configure() -> None:
+    """Install the stdout handler once, leaving existing logging setups alone."""
+    root = logging.getLogger()
+    if root.handlers:
+        return
+    handler = logging.StreamHandler(sys.stdout)
+    handler.setFormatter(CachedTimeFormatter(LOG_FORMAT, validate=False))
+    root.addHandler(handler)
+    root.setLevel(logging.INFO)
+
 
 # Configure structured logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.StreamHandler(sys.stdout)
-    ]
-)
+_configure()
+
+
+# One JSON line per collected event goes to stdout (useful on cloud providers).
+# Records are handed to a queue; the blocking stdout write happens on the
+# QueueListener's background thread instead of the request path.
+_stdout_queue: "queue.SimpleQueue[logging.LogRecord]" = queue.SimpleQueue()
+_stdout_listener: Optional[logging.handlers.QueueListener] = None
+
+stdout_logger = logging.getLogger("collabx_server.stdout")
+stdout_logger.addHandler(logging.handlers.QueueHandler(_stdout_queue))
+stdout_logger.setLevel(logging.INFO)
+stdout_logger.propagate = False
+
+
+def start_stdout_listener() -> None:
+    """Start the background thread that writes event lines to stdout."""
+    global _stdout_listener
+    if _stdout_listener is not None:
+        return
+    handler = logging.StreamHandler(sys.stdout)
+    handler.setFormatter(logging.Formatter("%(message)s"))
+    _stdout_listener = logging.handlers.QueueListener(_stdout_queue, handler)
+    _stdout_listener.start()
+
+
+def stop_stdout_listener() -> None:
+    """Flush pending event lines and stop the background writer."""
+    global _stdout_listener
+    if _stdout_listener is None:
+        return
+    _stdout_listener.stop()
+    _stdout_listener = None
+
+
+def emit_stdout_line(line: str) -> None:
+    """Queue a pre-serialized JSON line for stdout without blocking.
+    
+    Args:
+        line: Serialized event line (no trailing newline)
+    """
+    stdout_logger.info(line)
 
 
 def get_logger(name: str) -> logging.Logger:
@@ -34,6 +105,8 @@ def log_event(logger: logging.Logger, event_data: dict[str, Any]) -> None:
         logger: Logger instance
         event_data: Event data to log
     """
+    if not logger.isEnabledFor(logging.INFO):
+        return
     logger.info(
         "Event collected",
         extra={
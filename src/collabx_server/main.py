@@ -1,14 +1,14 @@
 from __future__ import annotations
 
-import asyncio
-import json
+import functools
 import time
+import zlib
 from contextlib import asynccontextmanager
-from datetime import datetime, timezone
 from typing import Dict, Optional, Any
 
+import orjson
 from fastapi import FastAPI, Request, Response, Query
-from fastapi.responses import JSONResponse, StreamingResponse, PlainTextResponse
+from fastapi.responses import JSONResponse, StreamingResponse
 from fastapi.middleware.cors import CORSMiddleware
 
 from .settings import Settings
@@ -16,31 +16,78 @@ from .storage import EventStore
 from .sse import SSEBroadcaster
 from .security import (
     verify_token_or_404,
-    best_client_ip,
-    clamp_headers,
+    client_ip_from_headers,
+    extract_headers,
     apply_redactions,
     decode_body_bytes,
 )
 from .middleware import RateLimitMiddleware
-from .export import export_to_json, export_to_csv, export_to_ndjson
-from .logging_config import get_logger, log_event
+from .export import CSV_COLUMNS, stream_csv_rows, stream_json, stream_ndjson
+from .logging_config import (
+    get_logger,
+    log_event,
+    emit_stdout_line,
+    start_stdout_listener,
+    stop_stdout_listener,
+)
 
 logger = get_logger(__name__)
 
+# Event fields echoed to the stdout line (headers and bodies are left out).
+STDOUT_KEYS = (
+    "id",
+    "received_at",
+    "method",
+    "path",
+    "query",
+    "client_ip",
+    "origin",
+    "referer",
+    "user_agent",
+    "body_truncated",
+    "content_type",
+)
+
+
+class ORJSONResponse(JSONResponse):
+    """JSONResponse rendered with orjson (UTF-8 bytes, no str round-trip)."""
+
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS)
+
+
+def _build_sse_frame(evt: Dict[str, Any]) -> bytes:
+    return b"data: " + orjson.dumps(evt, option=orjson.OPT_NON_STR_KEYS) + b"\n\n"
+
+
+@functools.lru_cache(maxsize=1)
+def _utc_second_prefix(seconds: int) -> str:
+    return time.strftime("%Y-%m-%dT%H:%M:%S", time.gmtime(seconds))
 
-def utc_now_iso() -> str:
-    return datetime.now(timezone.utc).isoformat()
+
+def utc_now_iso(now_us: Optional[int] = None) -> str:
+    """UTC time in isoformat() layout, without building a datetime.
+
+    `now_us` is epoch microseconds (the current time if omitted). The
+    date/time part is formatted once per second; only the microseconds change
+    between calls within the same second.
+    """
+    if now_us is None:
+        now_us = time.time_ns() // 1000
+    seconds, micros = divmod(now_us, 1_000_000)
+    return f"{_utc_second_prefix(seconds)}.{micros:06d}+00:00"
 
 
 def create_app() -> FastAPI:
     settings = Settings()  # reads env
     store = EventStore(settings.db_path)
-    broadcaster = SSEBroadcaster(queue_size=200)
+    broadcaster = SSEBroadcaster(buffer_size=200)
     start_time = time.time()
 
     @asynccontextmanager
     async def lifespan(app: FastAPI):
         logger.info("Starting CollabX server", extra={"db_path": settings.db_path})
+        start_stdout_listener()
         await store.connect()
         app.state.settings = settings
         app.state.store = store
@@ -49,12 +96,13 @@ def create_app() -> FastAPI:
         yield
         logger.info("Shutting down CollabX server")
         await store.close()
+        stop_stdout_listener()
 
     app = FastAPI(
         title="CollabX Collector",
         description="Ephemeral HTTP callback collector for security testing and webhooks",
         version="0.4.0",
-        lifespan=lifespan
+        lifespan=lifespan,
     )
     
     # Add CORS middleware
@@ -90,42 +138,50 @@ def create_app() -> FastAPI:
         if extra_path:
             path += f"/{extra_path}"
 
-        query_raw = request.url.query or ""
-        query = apply_redactions(query_raw, settings.redact_pattern_list())
-
-        client_ip, xff, xri = best_client_ip(request)
-
-        allow = settings.header_allowlist_set()
-        headers: Dict[str, str] = {}
-        for k, v in request.headers.items():
-            kl = k.lower()
-            if kl in allow:
-                headers[kl] = v
-        headers = clamp_headers(headers, settings.max_header_bytes)
+        # Redaction is off by default; skip both calls when no patterns are configured.
+        redactions = settings.redact_regexes
+        query = request.url.query or ""
+        if redactions:
+            query = apply_redactions(query, redactions)
 
-        origin = request.headers.get("origin", "")
-        referer = request.headers.get("referer", "")
-        user_agent = request.headers.get("user-agent", "")
-        content_type = request.headers.get("content-type", "")
+        headers, well_known = extract_headers(
+            request.headers.raw, settings.header_allowlist_frozen, settings.max_header_bytes
+        )
+        client_ip, xff, xri = client_ip_from_headers(
+            well_known, request.client.host if request.client else ""
+        )
+        origin = well_known.get("origin", "")
+        referer = well_known.get("referer", "")
+        user_agent = well_known.get("user-agent", "")
+        content_type = well_known.get("content-type", "")
 
         body_text: Optional[str] = None
         body_b64: Optional[str] = None
         body_truncated = False
 
         if request.method in ("POST", "PUT", "PATCH") and settings.store_raw_body:
-            body = await request.body()
-            if body and len(body) > settings.max_body_bytes:
-                body = body[: settings.max_body_bytes]
-                body_truncated = True
+            # Read only up to the storage cap; oversized uploads are never buffered whole.
+            limit = settings.max_body_bytes
+            body = bytearray()
+            async for chunk in request.stream():
+                body += chunk
+                if len(body) > limit:
+                    del body[limit:]
+                    body_truncated = True
+                    break
 
             bt, bb = decode_body_bytes(body)
-            if bt is not None:
-                bt = apply_redactions(bt, settings.redact_pattern_list())
+            if bt is not None and redactions:
+                bt = apply_redactions(bt, redactions)
             body_text, body_b64 = bt, bb
 
-        received_at = utc_now_iso()
+        # One clock read feeds both the ISO string and the integer time column,
+        # so the store never parses the string back.
+        received_at_us = time.time_ns() // 1000
+        received_at = utc_now_iso(received_at_us)
         event_id = await store.add_event(
             received_at=received_at,
+            received_at_us=received_at_us,
             method=request.method,
             path=path,
             query=query,
@@ -164,29 +220,18 @@ def create_app() -> FastAPI:
         # Structured logging
         log_event(logger, event)
         
-        # Also print JSON line to stdout (useful on cloud providers)
-        print(
-            json.dumps(
-                {
-                    "id": event_id,
-                    "received_at": received_at,
-                    "method": request.method,
-                    "path": path,
-                    "query": query,
-                    "client_ip": client_ip,
-                    "origin": origin,
-                    "referer": referer,
-                    "user_agent": user_agent,
-                    "body_truncated": body_truncated,
-                    "content_type": content_type,
-                },
-                ensure_ascii=False,
-            ),
-            flush=True,
+        # Also emit a JSON line to stdout (written off the request path)
+        emit_stdout_line(
+            orjson.dumps(
+                {k: event[k] for k in STDOUT_KEYS}, option=orjson.OPT_NON_STR_KEYS
+            ).decode("utf-8")
         )
 
-        broadcaster.publish_nowait(event)
-        return JSONResponse({"ok": True, "id": event_id})
+        # Encode the SSE frame once; every subscriber sends the same bytes.
+        broadcaster.publish_nowait(_build_sse_frame(event))
+        # No response_model on collector routes: returning a Response directly
+        # skips FastAPI's validation/encoding pass for every callback.
+        return ORJSONResponse({"ok": True, "id": event_id})
 
     @app.get("/{token}/c", tags=["Collector"])
     async def collect_get(request: Request, token: str):
@@ -210,6 +255,7 @@ def create_app() -> FastAPI:
 
     @app.get("/{token}/logs", tags=["Logs"])
     async def get_logs(
+        request: Request,
         token: str,
         after_id: int = Query(default=0, ge=0, description="Start cursor (event ID)"),
         limit: int = Query(default=50, ge=1, le=200, description="Max events to return"),
@@ -218,32 +264,48 @@ def create_app() -> FastAPI:
     ):
         """Get collected events with optional filtering."""
         verify_token_or_404(token, settings)
-        events, last_id = await store.get_events(
+        # No page can change until an event is added or deleted, so the store
+        # version plus the request's own parameters identify the response. The
+        # tag is built before querying, so an idle poll answered with 304 costs
+        # neither the query nor the encoding. Client input only enters hashed.
+        last_id_seen, cleanups = store.version
+        params = orjson.dumps([after_id, limit, method, path_contains])
+        etag = 'W/"%d-%d-%08x"' % (last_id_seen, cleanups, zlib.crc32(params))
+        if request.headers.get("if-none-match") == etag:
+            return Response(status_code=304, headers={"ETag": etag})
+
+        events_json, last_id, count = await store.get_events_json(
             after_id=after_id,
             limit=limit,
             method=method,
             path_contains=path_contains
         )
-        return {"events": events, "next_after_id": last_id, "count": len(events)}
+        # The events arrive pre-encoded; only the envelope is added here, and
+        # returning a Response skips jsonable_encoder entirely.
+        return Response(
+            content=b'{"events":%b,"next_after_id":%d,"count":%d}' % (events_json, last_id, count),
+            media_type="application/json",
+            headers={"ETag": etag},
+        )
 
     @app.get("/{token}/events", tags=["Logs"])
     async def sse_events(token: str):
         """Opt-in real-time stream (SSE)."""
         verify_token_or_404(token, settings)
         logger.debug(f"SSE client connected for token: {token[:8]}...")
-        q = broadcaster.subscribe()
 
         async def gen():
-            yield ":ok\n\n"
+            cursor = broadcaster.subscribe()
             try:
+                yield b":ok\n\n"
                 while True:
-                    try:
-                        evt = await asyncio.wait_for(q.get(), timeout=15.0)
-                        yield f"data: {json.dumps(evt, ensure_ascii=False)}\n\n"
-                    except asyncio.TimeoutError:
-                        yield ":keepalive\n\n"
+                    frames, cursor = await broadcaster.wait_for_items(cursor, timeout=15.0)
+                    if not frames:
+                        yield b":keepalive\n\n"
+                    else:
+                        yield b"".join(frames)
             finally:
-                broadcaster.unsubscribe(q)
+                broadcaster.unsubscribe()
                 logger.debug(f"SSE client disconnected for token: {token[:8]}...")
 
         headers = {
@@ -258,7 +320,7 @@ def create_app() -> FastAPI:
         """Get collection statistics."""
         verify_token_or_404(token, settings)
         stats = await store.get_statistics()
-        return stats
+        return ORJSONResponse(stats)
     
     @app.get("/{token}/export", tags=["Export"])
     async def export_logs(
@@ -269,23 +331,24 @@ def create_app() -> FastAPI:
     ):
         """Export collected events in various formats."""
         verify_token_or_404(token, settings)
-        events, _ = await store.get_events(after_id=after_id, limit=limit)
-        
+        # Rows are read from the cursor and encoded as the response is sent,
+        # so memory stays flat however many events are exported.
         if format == "csv":
-            content = export_to_csv(events)
+            # CSV only needs flat columns, so skip event dicts (and bodies) entirely
+            body = stream_csv_rows(store.iter_rows(after_id, limit, CSV_COLUMNS))
             media_type = "text/csv"
             filename = f"collabx_export_{int(time.time())}.csv"
         elif format == "ndjson":
-            content = export_to_ndjson(events)
+            body = stream_ndjson(store.iter_events(after_id=after_id, limit=limit))
             media_type = "application/x-ndjson"
             filename = f"collabx_export_{int(time.time())}.ndjson"
         else:  # json
-            content = export_to_json(events)
+            body = stream_json(store.iter_events(after_id=after_id, limit=limit))
             media_type = "application/json"
             filename = f"collabx_export_{int(time.time())}.json"
         
-        return PlainTextResponse(
-            content=content,
+        return StreamingResponse(
+            body,
             media_type=media_type,
             headers={"Content-Disposition": f"attachment; filename={filename}"}
         )
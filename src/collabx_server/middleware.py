@@ -2,54 +2,65 @@
 from __future__ import annotations
 
 import time
-from collections import defaultdict
-from typing import Callable
+from collections import OrderedDict, deque
 
-from fastapi import Request, Response, HTTPException
-from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Receive, Scope, Send
 
 from .logging_config import get_logger
 
 logger = get_logger(__name__)
 
 
-class RateLimitMiddleware(BaseHTTPMiddleware):
+class RateLimitMiddleware:
     """Rate limiting middleware to prevent abuse.
-    
-    Implements a simple token bucket algorithm per IP address.
+
+    Implements a sliding one-minute window per IP address. Written as plain
+    ASGI middleware (no BaseHTTPMiddleware request/response wrapping), and
+    each IP keeps at most `requests_per_minute` timestamps in a bounded deque.
+    At most `max_clients` IPs are tracked; the least recently seen IP is
+    evicted first, so sprayed or forged addresses cannot grow memory forever.
     """
-    
-    def __init__(self, app, requests_per_minute: int = 60):
-        super().__init__(app)
+
+    def __init__(self, app: ASGIApp, requests_per_minute: int = 60, max_clients: int = 50_000):
+        self.app = app
         self.requests_per_minute = requests_per_minute
-        self.requests: dict[str, list[float]] = defaultdict(list)
-        
-    async def dispatch(self, request: Request, call_next: Callable) -> Response:
-        # Skip rate limiting for health check
-        if request.url.path == "/healthz":
-            return await call_next(request)
-            
+        self.max_clients = max_clients
+        self.requests: OrderedDict[str, deque[float]] = OrderedDict()
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        # Skip rate limiting for non-HTTP traffic and the health check
+        if scope["type"] != "http" or scope["path"] == "/healthz":
+            await self.app(scope, receive, send)
+            return
+
         # Get client IP
-        client_ip = request.client.host if request.client else "unknown"
-        if "x-forwarded-for" in request.headers:
-            client_ip = request.headers["x-forwarded-for"].split(",")[0].strip()
-            
-        # Clean old requests (older than 1 minute)
+        client = scope.get("client")
+        client_ip = client[0] if client else "unknown"
+        for name, value in scope["headers"]:
+            if name == b"x-forwarded-for":
+                client_ip = value.decode("latin-1").split(",")[0].strip()
+                break
+
+        # Check rate limit: a full window whose oldest entry is under a minute old
         now = time.time()
-        self.requests[client_ip] = [
-            req_time for req_time in self.requests[client_ip]
-            if now - req_time < 60
-        ]
-        
-        # Check rate limit
-        if len(self.requests[client_ip]) >= self.requests_per_minute:
+        window = self.requests.get(client_ip)
+        if window is None:
+            window = self.requests[client_ip] = deque(maxlen=self.requests_per_minute)
+            if len(self.requests) > self.max_clients:
+                self.requests.popitem(last=False)
+        else:
+            self.requests.move_to_end(client_ip)
+        if len(window) >= self.requests_per_minute and (not window or now - window[0] < 60):
             logger.warning(f"Rate limit exceeded for IP: {client_ip}")
-            raise HTTPException(
+            response = JSONResponse(
+                {"detail": "Too many requests. Please try again later."},
                 status_code=429,
-                detail="Too many requests. Please try again later."
             )
-            
-        # Add current request
-        self.requests[client_ip].append(now)
-        
-        return await call_next(request)
+            await response(scope, receive, send)
+            return
+
+        # Add current request (the deque drops the oldest timestamp when full)
+        window.append(now)
+
+        await self.app(scope, receive, send)
@@ -5,6 +5,12 @@ from typing import Any, Dict, Optional
 
 
 class EventOut(BaseModel):
+    """Shape of a stored event, for reference and client code.
+
+    Deliberately not used as a ``response_model``: handlers return
+    ``ORJSONResponse`` directly so events are never re-validated per response.
+    """
+
     id: int
     received_at: str
 
@@ -1,8 +1,8 @@
 from __future__ import annotations
 
-import base64
+import binascii
 import re
-from typing import Dict, Tuple, Optional, List
+from typing import Dict, FrozenSet, Iterable, Mapping, Tuple, Optional, Sequence, Union
 
 from fastapi import HTTPException, Request
 from .settings import Settings
@@ -10,16 +10,22 @@ from .settings import Settings
 
 def verify_token_or_404(token_in_path: str, settings: Settings) -> None:
     # Use 404 to reduce noise and avoid giving hints.
-    if token_in_path not in set(settings.tokens()):
+    if token_in_path not in settings.token_set:
         raise HTTPException(status_code=404, detail="Not found")
 
 
 def best_client_ip(request: Request) -> Tuple[str, str, str]:
+    client_host = request.client.host if request.client else ""
+    return client_ip_from_headers(request.headers, client_host)
+
+
+def client_ip_from_headers(headers: Mapping[str, str], client_host: str) -> Tuple[str, str, str]:
+    """Pick the client IP from already-extracted headers (e.g. extract_headers' well-known values)."""
     # Common proxy headers; store chain for forensics
-    xff = request.headers.get("x-forwarded-for", "")
-    xri = request.headers.get("x-real-ip", "")
-    cf = request.headers.get("cf-connecting-ip", "")
-    tci = request.headers.get("true-client-ip", "")
+    xff = headers.get("x-forwarded-for", "")
+    xri = headers.get("x-real-ip", "")
+    cf = headers.get("cf-connecting-ip", "")
+    tci = headers.get("true-client-ip", "")
 
     # Prefer the left-most public-ish IP in XFF when present
     chosen = ""
@@ -32,8 +38,8 @@ def best_client_ip(request: Request) -> Tuple[str, str, str]:
         chosen = tci.strip()
     elif xri:
         chosen = xri.strip()
-    elif request.client and request.client.host:
-        chosen = request.client.host
+    elif client_host:
+        chosen = client_host
 
     return chosen or "", xff, xri
 
@@ -51,11 +57,58 @@ def clamp_headers(headers: Dict[str, str], max_total_bytes: int) -> Dict[str, st
     return out
 
 
-def apply_redactions(text: str, patterns: List[str]) -> str:
+# Headers surfaced as top-level event fields regardless of the allowlist.
+WELL_KNOWN_HEADERS = frozenset(
+    {
+        "origin",
+        "referer",
+        "user-agent",
+        "content-type",
+        # proxy headers consulted by client_ip_from_headers
+        "x-forwarded-for",
+        "x-real-ip",
+        "cf-connecting-ip",
+        "true-client-ip",
+    }
+)
+
+
+def extract_headers(
+    raw_headers: Iterable[Tuple[bytes, bytes]],
+    allowlist: FrozenSet[str],
+    max_total_bytes: int,
+) -> Tuple[Dict[str, str], Dict[str, str]]:
+    """Single pass over raw ASGI headers.
+
+    Returns (allowlisted headers clamped to max_total_bytes, well-known header values).
+    The well-known values keep the first occurrence, like Headers.get().
+    """
+    stored: Dict[str, str] = {}
+    well_known: Dict[str, str] = {}
+    total = 0
+    clamped = False
+    for k, v in raw_headers:
+        name = k.lower().decode("latin-1")
+        if name in WELL_KNOWN_HEADERS and name not in well_known:
+            well_known[name] = v.decode("latin-1")
+        if name in allowlist and not clamped:
+            total += len(k) + 1 + len(v)
+            if total > max_total_bytes:
+                clamped = True
+            else:
+                stored[name] = v.decode("latin-1")
+    return stored, well_known
+
+
+def apply_redactions(text: str, patterns: Sequence[Union[str, re.Pattern]]) -> str:
+    # Accepts precompiled patterns (see Settings.redact_regexes) or raw strings.
     if not patterns or not text:
         return text
     redacted = text
     for pat in patterns:
+        if isinstance(pat, re.Pattern):
+            redacted = pat.sub("[REDACTED]", redacted)
+            continue
         try:
             redacted = re.sub(pat, "[REDACTED]", redacted, flags=re.IGNORECASE)
         except re.error:
@@ -67,7 +120,10 @@ def apply_redactions(text: str, patterns: List[str]) -> str:
 def decode_body_bytes(body: bytes) -> Tuple[Optional[str], Optional[str]]:
     if body is None:
         return None, None
+    # Most payloads are plain ASCII (JSON, form data); isascii() is a cheap C scan.
+    if body.isascii():
+        return body.decode("ascii"), None
     try:
         return body.decode("utf-8"), None
     except UnicodeDecodeError:
-        return None, base64.b64encode(body).decode("ascii")
+        return None, binascii.b2a_base64(body, newline=False).decode("ascii")
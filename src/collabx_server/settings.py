@@ -1,8 +1,11 @@
 from __future__ import annotations
 
+import re
+from functools import cached_property
+
 from pydantic_settings import BaseSettings, SettingsConfigDict
 from pydantic import Field
-from typing import List
+from typing import Any, FrozenSet, List, Tuple
 
 
 class Settings(BaseSettings):
@@ -31,14 +34,42 @@ class Settings(BaseSettings):
     rate_limit_per_minute: int = Field(default=60, description="Max requests per minute per IP.")
     retention_days: int = Field(default=30, description="Default retention period for events (days).")
 
+    def model_post_init(self, __context: Any) -> None:
+        # Warm the per-request lookups up front so the first requests (and
+        # unauthenticated scan traffic hitting verify_token_or_404) never parse.
+        self.token_set
+        self.header_allowlist_frozen
+        self.redact_regexes
+
     def tokens(self) -> List[str]:
         return [t.strip() for t in self.token.split(",") if t.strip()]
 
     def header_allowlist_set(self) -> set[str]:
         return {h.strip().lower() for h in self.header_allowlist.split(",") if h.strip()}
 
+    # Derived values used on every request are computed once per Settings instance.
+    @cached_property
+    def token_set(self) -> FrozenSet[str]:
+        return frozenset(self.tokens())
+
+    @cached_property
+    def header_allowlist_frozen(self) -> FrozenSet[str]:
+        return frozenset(self.header_allowlist_set())
+
     def redact_pattern_list(self) -> List[str]:
         return [p.strip() for p in self.redact_patterns.split(",") if p.strip()]
+
+    @cached_property
+    def redact_regexes(self) -> Tuple[re.Pattern, ...]:
+        """Redaction patterns compiled once (case-insensitive); invalid ones are skipped."""
+        compiled = []
+        for pat in self.redact_pattern_list():
+            try:
+                compiled.append(re.compile(pat, re.IGNORECASE))
+            except re.error:
+                # Ignore invalid regex rather than breaking the collector
+                continue
+        return tuple(compiled)
     
     def cors_origins_list(self) -> List[str]:
         return [o.strip() for o in self.cors_origins.split(",") if o.strip()]
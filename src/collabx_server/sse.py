@@ -1,34 +1,70 @@
 from __future__ import annotations
 
 import asyncio
-from typing import Any, Dict, Set
+import itertools
+from collections import deque
+from typing import Any, Deque, List, Tuple
 
 
 class SSEBroadcaster:
     """Tiny in-memory pub/sub for SSE.
 
-    Best-effort: if a subscriber is slow and its queue fills, we drop events for that subscriber.
+    Published items go into one shared ring buffer tagged with a sequence
+    number; subscribers keep their own cursor and wake on a shared asyncio.Event
+    instead of each owning a queue, so publishing is O(1) regardless of the
+    number of subscribers.
+
+    Best-effort: if a subscriber falls more than `buffer_size` items behind,
+    the oldest items are dropped for it.
     """
 
-    def __init__(self, queue_size: int = 200):
-        self._subs: Set[asyncio.Queue] = set()
-        self._queue_size = queue_size
+    def __init__(self, buffer_size: int = 200):
+        self._buffer: Deque[Tuple[int, Any]] = deque(maxlen=buffer_size)
+        self._seq = 0
+        self._new_item = asyncio.Event()
+        self._waiters = 0
+        self._subscribers = 0
+
+    def subscribe(self) -> int:
+        """Register a subscriber and return its starting cursor."""
+        self._subscribers += 1
+        return self._seq
+
+    def unsubscribe(self) -> None:
+        self._subscribers = max(0, self._subscribers - 1)
+
+    def publish_nowait(self, item: Any) -> None:
+        self._seq += 1
+        self._buffer.append((self._seq, item))
+        # Wake everyone waiting on the current event, then start a fresh one.
+        # With nobody waiting the current event is still unset and reusable,
+        # so publishing allocates nothing.
+        if self._waiters:
+            self._new_item.set()
+            self._new_item = asyncio.Event()
 
-    def subscribe(self) -> asyncio.Queue:
-        q: asyncio.Queue = asyncio.Queue(maxsize=self._queue_size)
-        self._subs.add(q)
-        return q
+    def _items_after(self, cursor: int) -> List[Any]:
+        pending = self._seq - cursor
+        start = max(0, len(self._buffer) - pending)
+        return [item for _, item in itertools.islice(self._buffer, start, None)]
 
-    def unsubscribe(self, q: asyncio.Queue) -> None:
-        self._subs.discard(q)
+    async def wait_for_items(self, cursor: int, timeout: float) -> Tuple[List[Any], int]:
+        """Return items published after `cursor` and the new cursor.
 
-    def publish_nowait(self, event: Dict[str, Any]) -> None:
-        for q in list(self._subs):
+        Waits up to `timeout` seconds if nothing is pending; an empty list means
+        the wait timed out (no TimeoutError is raised for idle ticks).
+        """
+        if cursor == self._seq:
+            waiter = asyncio.ensure_future(self._new_item.wait())
+            self._waiters += 1
             try:
-                q.put_nowait(event)
-            except asyncio.QueueFull:
-                pass
+                await asyncio.wait({waiter}, timeout=timeout)
+            finally:
+                self._waiters -= 1
+                if not waiter.done():
+                    waiter.cancel()
+        return self._items_after(cursor), self._seq
 
     @property
     def subscriber_count(self) -> int:
-        return len(self._subs)
+        return self._subscribers
@@ -1,9 +1,34 @@
 from __future__ import annotations
 
-import json
-from typing import Any, Dict, List, Optional, Tuple
+import asyncio
+import bisect
+import functools
+import queue
+import sqlite3
+import sys
+import threading
+import time
+import zlib
+from array import array
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from typing import (
+    Any,
+    AsyncIterator,
+    Callable,
+    Dict,
+    List,
+    Optional,
+    Sequence,
+    Set,
+    Tuple,
+    TypeVar,
+)
 
-import aiosqlite
+import orjson
+
+T = TypeVar("T")
 
 
 CREATE_SQL = """
@@ -19,35 +44,711 @@ CREATE TABLE IF NOT EXISTS events (
   origin TEXT NOT NULL,
   referer TEXT NOT NULL,
   user_agent TEXT NOT NULL,
-  headers_json TEXT NOT NULL,
+  headers_json TEXT NOT NULL,  -- UTF-8 JSON; newer rows hold it as a BLOB
   body_text TEXT,
   body_b64 TEXT,
   body_truncated INTEGER NOT NULL,
-  content_type TEXT NOT NULL
+  content_type TEXT NOT NULL,
+  received_at_us INTEGER  -- received_at as epoch microseconds, for range filters
 );
-CREATE INDEX IF NOT EXISTS idx_events_id ON events(id);
-CREATE INDEX IF NOT EXISTS idx_events_received_at ON events(received_at);
-CREATE INDEX IF NOT EXISTS idx_events_method ON events(method);
+-- (method, id) serves "method = ? AND id > ? ORDER BY id" as one range scan
+CREATE INDEX IF NOT EXISTS idx_events_method_id ON events(method, id);
+-- Superseded: id is the rowid, and idx_events_method_id covers method lookups
+DROP INDEX IF EXISTS idx_events_id;
+DROP INDEX IF EXISTS idx_events_method;
+"""
+
+# Run after received_at_us is guaranteed to exist (older databases gain it via
+# ALTER TABLE first). Time filters use the integer column; the TEXT index on
+# received_at is no longer needed.
+TIME_INDEX_SQL = """
+CREATE INDEX IF NOT EXISTS idx_events_received_at_us ON events(received_at_us);
+DROP INDEX IF EXISTS idx_events_received_at;
 """
 
+# julianday() parses any ISO 8601 timestamp SQLite understands; 2440587.5 is
+# the Unix epoch as a Julian day.
+BACKFILL_RECEIVED_AT_US_SQL = """
+UPDATE events
+SET received_at_us = CAST(ROUND((julianday(received_at) - 2440587.5) * 86400000000) AS INTEGER)
+WHERE received_at_us IS NULL
+"""
+
+# Trigram full-text index over event paths, kept in sync by triggers. It turns
+# path_contains substring filters into index lookups instead of a LIKE scan.
+FTS_SQL = """
+CREATE VIRTUAL TABLE IF NOT EXISTS events_fts USING fts5(
+  path, content='events', content_rowid='id', tokenize='trigram'
+);
+CREATE TRIGGER IF NOT EXISTS events_fts_ai AFTER INSERT ON events BEGIN
+  INSERT INTO events_fts(rowid, path) VALUES (new.id, new.path);
+END;
+CREATE TRIGGER IF NOT EXISTS events_fts_ad AFTER DELETE ON events BEGIN
+  INSERT INTO events_fts(events_fts, rowid, path) VALUES ('delete', old.id, old.path);
+END;
+"""
+
+# Trigram MATCH needs at least three characters; shorter filters use LIKE.
+MIN_FTS_SUBSTRING = 3
+
+INSERT_SQL = """
+INSERT INTO events (
+  received_at, method, path, query,
+  client_ip, x_forwarded_for, x_real_ip,
+  origin, referer, user_agent,
+  headers_json, body_text, body_b64, body_truncated, content_type,
+  received_at_us
+) VALUES (?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?)
+"""
+
+# Applied to every connection, in order. page_size and auto_vacuum only take
+# effect on a new database, so they must run before WAL mode is switched on
+# and before any table exists. Durability: with
+# synchronous=NORMAL under WAL an application crash loses nothing, but a power
+# loss/OS crash may drop the last few committed batches.
+CONNECTION_PRAGMAS = (
+    "PRAGMA page_size=8192",
+    "PRAGMA auto_vacuum=INCREMENTAL",  # cleanup hands freed pages back to the OS
+    "PRAGMA journal_mode=WAL",
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA cache_size=-65536",  # 64 MiB page cache
+    "PRAGMA mmap_size=268435456",  # 256 MiB memory-mapped reads
+    "PRAGMA wal_autocheckpoint=1000",
+    "PRAGMA secure_delete=OFF",  # deleted rows aren't zeroed on disk
+)
+
+# Reader connections never write; they only need the per-connection caches.
+READER_PRAGMAS = (
+    "PRAGMA query_only=ON",
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA cache_size=-65536",
+    "PRAGMA mmap_size=268435456",
+)
+
+# Bodies at least this long are stored as a compressed BLOB: a one-byte codec
+# tag followed by the payload. Shorter bodies, and bodies that don't shrink,
+# stay plain TEXT, so rows written before compression existed read unchanged.
+BODY_COMPRESS_MIN = 512
+BODY_CODEC_ZLIB = 0x01
+BODY_COMPRESS_LEVEL = 1
+
+# Per-connection prepared statement cache (sqlite3 defaults to 128).
+CACHED_STATEMENTS = 256
+
+# Writer batching: always take at least MIN_BATCH queued inserts when available,
+# more (up to MAX_BATCH) when the backlog grows.
+MIN_BATCH = 8
+MAX_BATCH = 500
+
+# Keyset pagination: id is the rowid, so "id > ? ORDER BY id LIMIT ?" is a
+# B-tree seek with no sort step (checked with EXPLAIN QUERY PLAN in the tests).
+SELECT_EVENTS_SQL = """
+SELECT
+  id, received_at, method, path, query,
+  client_ip, x_forwarded_for, x_real_ip,
+  origin, referer, user_agent,
+  headers_json, body_text, body_b64, body_truncated, content_type
+FROM events
+WHERE {where_clause}
+ORDER BY id ASC
+LIMIT ?
+"""
+
+# Unfiltered keyset scan over a caller-chosen set of columns (id first).
+SELECT_ROWS_SQL = "SELECT {columns} FROM events WHERE id > ? ORDER BY id ASC LIMIT ?"
+
+
+# Distinct client IPs tracked in memory for /stats; past this the exact
+# COUNT(DISTINCT) query is used instead so IP sprays can't grow memory.
+MAX_TRACKED_IPS = 100_000
+
+# Newest events kept in memory to answer unfiltered /logs polls without
+# SQLite. Bounded by count and by the size of their headers and bodies, which
+# are held uncompressed: one client can send max_body_bytes on every request.
+RECENT_EVENTS = 2_000
+RECENT_EVENTS_BYTES = 32 * 1024 * 1024
+
+# Row tuple positions (INSERT_SQL column order) read by the stats counters.
+_ROW_RECEIVED_AT = 0
+_ROW_METHOD = 1
+_ROW_CLIENT_IP = 4
+_ROW_HEADERS = 10
+_ROW_BODY_TEXT = 11
+_ROW_BODY_B64 = 12
+_ROW_RECEIVED_AT_US = 15
+
+
+class _EventCounters:
+    """Running totals behind get_statistics, updated as batches commit.
+
+    Seeded from the table once at connect and after cleanups, so /stats no
+    longer scans the events table. Assumes this process is the only writer.
+
+    record() and load() run on the writer thread, in the same jobs as the
+    inserts and deletes they account for, so every committed batch is
+    counted exactly once relative to a reload. The lock only guards against
+    the event loop taking a snapshot() mid-update.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.total = 0
+        self.by_method: Counter[str] = Counter()
+        self.first_event: Optional[str] = None
+        self.last_event: Optional[str] = None
+        self.client_ips: Optional[Set[str]] = set()
+        # Events per epoch minute of their received_at_us, for the last 24
+        # hours (and any future-dated ones); same buckets as _minute_buckets.
+        self.minutes: Counter[int] = Counter()
+
+    def load(self, db: sqlite3.Connection) -> None:
+        """Reseed from the table, running each counter query in turn on `db`."""
+        self.apply(*(query(db) for query in _COUNTER_QUERIES))
+
+    def apply(
+        self,
+        by_method: Dict[str, int],
+        first_last: Tuple[Optional[str], Optional[str]],
+        client_ips: Optional[Set[str]],
+        minutes: List[Tuple[int, int]],
+    ) -> None:
+        """Replace the totals with results of the _COUNTER_QUERIES, in order."""
+        with self._lock:
+            self.by_method = Counter(by_method)
+            self.total = sum(self.by_method.values())
+            self.first_event, self.last_event = first_last
+            self.client_ips = client_ips
+            self.minutes = Counter(dict(minutes))
+
+    def record(self, rows: Sequence[Tuple[Any, ...]]) -> None:
+        with self._lock:
+            self._record(rows)
+
+    def _record(self, rows: Sequence[Tuple[Any, ...]]) -> None:
+        self.total += len(rows)
+        for row in rows:
+            received_at = row[_ROW_RECEIVED_AT]
+            self.by_method[row[_ROW_METHOD]] += 1
+            if self.first_event is None or received_at < self.first_event:
+                self.first_event = received_at
+            if self.last_event is None or received_at > self.last_event:
+                self.last_event = received_at
+            if self.client_ips is not None and row[_ROW_CLIENT_IP]:
+                self.client_ips.add(row[_ROW_CLIENT_IP])
+        if self.client_ips is not None and len(self.client_ips) > MAX_TRACKED_IPS:
+            self.client_ips = None
+
+        # Bucket by the event's own timestamp, as the reseed does, so the 24h
+        # count doesn't change across a restart. Rows can arrive out of order.
+        cutoff = _last_24h_cutoff_minute()
+        for row in rows:
+            received_at_us = row[_ROW_RECEIVED_AT_US]
+            if received_at_us is not None and received_at_us // 60_000_000 > cutoff:
+                self.minutes[received_at_us // 60_000_000] += 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Current totals; unique_ips is None once too many IPs were seen to track."""
+        with self._lock:
+            return {
+                "total_events": self.total,
+                "events_last_24h": self._last_24h(),
+                "unique_ips": len(self.client_ips) if self.client_ips is not None else None,
+                "by_method": dict(self.by_method.most_common()),
+                "first_event": self.first_event or None,
+                "last_event": self.last_event or None,
+            }
+
+    def _last_24h(self) -> int:
+        cutoff = _last_24h_cutoff_minute()
+        for minute in [m for m in self.minutes if m <= cutoff]:
+            del self.minutes[minute]
+        return sum(self.minutes.values())
+
+
+def _count_by_method(db: sqlite3.Connection) -> Dict[str, int]:
+    return dict(db.execute("SELECT method, COUNT(*) FROM events GROUP BY method").fetchall())
+
+
+def _first_last_event(db: sqlite3.Connection) -> Tuple[Optional[str], Optional[str]]:
+    return db.execute(
+        """
+        SELECT
+          (SELECT received_at FROM events WHERE received_at_us IS NOT NULL
+           ORDER BY received_at_us ASC LIMIT 1),
+          (SELECT received_at FROM events WHERE received_at_us IS NOT NULL
+           ORDER BY received_at_us DESC LIMIT 1)
+        """
+    ).fetchone()
+
+
+def _distinct_client_ips(db: sqlite3.Connection) -> Optional[Set[str]]:
+    cur = db.execute(
+        "SELECT DISTINCT client_ip FROM events WHERE client_ip != '' LIMIT ?",
+        (MAX_TRACKED_IPS + 1,),
+    )
+    ips = {ip for (ip,) in cur.fetchall()}
+    return ips if len(ips) <= MAX_TRACKED_IPS else None
+
+
+def _last_24h_cutoff_minute() -> int:
+    """Epoch minutes at or before this are outside the 24 hour window."""
+    return int(time.time() // 60) - 24 * 60
+
+
+def _minute_buckets(db: sqlite3.Connection) -> List[Tuple[int, int]]:
+    first_us = (_last_24h_cutoff_minute() + 1) * 60_000_000
+    return db.execute(
+        """
+        SELECT received_at_us / 60000000 AS minute, COUNT(*)
+        FROM events
+        WHERE received_at_us >= ?
+        GROUP BY minute
+        ORDER BY minute
+        """,
+        (first_us,),
+    ).fetchall()
+
+
+# Independent queries seeding _EventCounters, in _EventCounters.apply order.
+# Each is its own scan, so they can run on separate connections at once.
+_COUNTER_QUERIES = (_count_by_method, _first_last_event, _distinct_client_ips, _minute_buckets)
+
+
+class _RecentBuffer:
+    """The newest committed events, column by column, for unfiltered reads.
+
+    Stored as parallel per-column lists (ids in an array('q')) rather than
+    a list of dicts: a committed batch is appended with one extend per
+    column, a page starts at a bisect over the ids, and dicts are only built
+    for the rows actually returned. The buffer always holds a contiguous
+    suffix of the table, so any `after_id >= min_id - 1` is answered here.
+    Holds at most `capacity` rows whose headers and bodies total at most
+    `max_bytes`. Only touched from the event loop, so it needs no locking.
+    """
+
+    def __init__(self, capacity: int, max_bytes: int = RECENT_EVENTS_BYTES) -> None:
+        self.capacity = capacity
+        self.max_bytes = max_bytes
+        self.nbytes = 0
+        self.ids = array("q")
+        self.sizes = array("q")
+        # One list per INSERT_SQL column from received_at to content_type
+        self.columns: Tuple[List[Any], ...] = tuple([] for _ in _EVENT_COLS[1:])
+
+    def covers(self, after_id: int) -> bool:
+        return bool(self.ids) and after_id >= self.ids[0] - 1
+
+    def extend(self, first_id: int, rows: Sequence[Tuple[Any, ...]]) -> None:
+        if not self.capacity:
+            return
+        sizes = [
+            sys.getsizeof(row[_ROW_HEADERS])
+            + sys.getsizeof(row[_ROW_BODY_TEXT])
+            + sys.getsizeof(row[_ROW_BODY_B64])
+            for row in rows
+        ]
+        self.ids.extend(range(first_id, first_id + len(rows)))
+        self.sizes.extend(sizes)
+        self.nbytes += sum(sizes)
+        for i, column in enumerate(self.columns):
+            column.extend([row[i] for row in rows])
+
+        # Drop the oldest rows until both bounds hold again
+        count = max(0, len(self.ids) - self.capacity)
+        dropped = sum(self.sizes[:count])
+        while count < len(self.ids) and self.nbytes - dropped > self.max_bytes:
+            dropped += self.sizes[count]
+            count += 1
+        self._drop_first(count)
+
+    def drop_before(self, event_id: int) -> None:
+        self._drop_first(bisect.bisect_left(self.ids, event_id))
+
+    def _drop_first(self, count: int) -> None:
+        if count:
+            self.nbytes -= sum(self.sizes[:count])
+            del self.ids[:count]
+            del self.sizes[:count]
+            for column in self.columns:
+                del column[:count]
+
+    def rows_after(self, after_id: int, limit: int) -> List[Tuple[Any, ...]]:
+        start = bisect.bisect_right(self.ids, after_id)
+        stop = start + limit
+        return list(zip(self.ids[start:stop], *(column[start:stop] for column in self.columns)))
+
+
+def _epoch_us(received_at: str) -> Optional[int]:
+    """Epoch microseconds for an ISO 8601 timestamp (naive values are taken as UTC)."""
+    try:
+        ts = datetime.fromisoformat(received_at)
+    except ValueError:
+        return None
+    if ts.tzinfo is None:
+        ts = ts.replace(tzinfo=timezone.utc)
+    return round(ts.timestamp() * 1_000_000)
+
+
+# Event dict keys, in SELECT_EVENTS_SQL column order ("headers" holds the raw
+# headers_json until it is parsed).
+_EVENT_COLS = (
+    "id",
+    "received_at",
+    "method",
+    "path",
+    "query",
+    "client_ip",
+    "x_forwarded_for",
+    "x_real_ip",
+    "origin",
+    "referer",
+    "user_agent",
+    "headers",
+    "body_text",
+    "body_b64",
+    "body_truncated",
+    "content_type",
+)
+
+
+@functools.lru_cache(maxsize=None)
+def _select_events_sql(by_method: bool, path_filter: Optional[str]) -> str:
+    """SQL for one filter combination, built once so the text (and its cached
+    prepared statement) is identical on every call."""
+    conditions = ["id > ?"]
+    if by_method:
+        conditions.append("method = ?")
+    if path_filter == "fts":
+        conditions.append("id IN (SELECT rowid FROM events_fts WHERE events_fts MATCH ?)")
+    elif path_filter == "like":
+        conditions.append("path LIKE ?")
+    return SELECT_EVENTS_SQL.format(where_clause=" AND ".join(conditions))
+
+
+@functools.lru_cache(maxsize=None)
+def _select_rows_sql(columns: Tuple[str, ...]) -> str:
+    if not columns or columns[0] != "id":
+        raise ValueError("columns must start with 'id'")
+    return SELECT_ROWS_SQL.format(columns=", ".join(columns))
+
+
+def _event_query(
+    after_id: int, method: Optional[str], path_contains: Optional[str], fts: bool = False
+) -> Tuple[str, List[Any]]:
+    """Pick the SQL and build the parameters shared by event queries."""
+    params: List[Any] = [after_id]
+
+    if method:
+        params.append(method.upper())
+
+    path_filter = None
+    if path_contains and fts and len(path_contains) >= MIN_FTS_SUBSTRING:
+        # A quoted phrase is matched literally as a substring by the trigram tokenizer
+        path_filter = "fts"
+        params.append('"' + path_contains.replace('"', '""') + '"')
+    elif path_contains:
+        path_filter = "like"
+        params.append(f"%{path_contains}%")
+
+    return _select_events_sql(bool(method), path_filter), params
+
+
+def _parse_headers(headers_json: Any) -> Dict[str, str]:
+    try:
+        return orjson.loads(headers_json) if headers_json else {}
+    except orjson.JSONDecodeError:
+        return {}
+
+
+def _rows_to_events(rows: Sequence[Tuple[Any, ...]]) -> List[Dict[str, Any]]:
+    events = [dict(zip(_EVENT_COLS, r)) for r in rows]
+
+    # Parse the whole page's headers with one orjson call: join the stored
+    # objects into a JSON array. Rows are BLOB (new) or TEXT (older) JSON.
+    raw = [
+        h if isinstance(h, bytes) else (h or "{}").encode("utf-8")
+        for h in (e["headers"] for e in events)
+    ]
+    try:
+        parsed = orjson.loads(b"[" + b",".join(h or b"{}" for h in raw) + b"]")
+    except orjson.JSONDecodeError:
+        parsed = None
+    if parsed is None or len(parsed) != len(events):
+        # A damaged row poisons the batch; fall back to parsing row by row.
+        parsed = [_parse_headers(h) for h in raw]
+
+    for event, headers in zip(events, parsed):
+        event["headers"] = headers if isinstance(headers, dict) else {}
+        event["body_text"] = _unpack_body(event["body_text"])
+        event["body_b64"] = _unpack_body(event["body_b64"])
+        event["body_truncated"] = bool(event["body_truncated"])
+    return events
+
+
+def _rows_to_json_array(rows: Sequence[Tuple[Any, ...]]) -> bytes:
+    """Encode event rows as the JSON array get_events' dicts would produce."""
+    parts = []
+    for row in rows:
+        event = dict(zip(_EVENT_COLS, row))
+        headers = event.pop("headers")
+        if isinstance(headers, bytes):
+            # BLOB headers are always orjson output, so they are valid JSON as stored
+            headers = headers or b"{}"
+        else:
+            # Older TEXT rows may be damaged; round-trip them to be safe
+            headers = orjson.dumps(_parse_headers(headers))
+        event["body_text"] = _unpack_body(event["body_text"])
+        event["body_b64"] = _unpack_body(event["body_b64"])
+        event["body_truncated"] = bool(event["body_truncated"])
+        # Drop the closing brace and append the headers member in its place
+        parts.append(orjson.dumps(event)[:-1] + b',"headers":' + headers + b"}")
+    return b"[" + b",".join(parts) + b"]"
+
+
+def _open_connection(db_path: str, pragmas: Sequence[str]) -> sqlite3.Connection:
+    # Autocommit mode: the writer opens and commits its own transactions
+    # explicitly, one per batch, instead of sqlite3's implicit BEGIN. Each
+    # connection is only ever used by one thread at a time (its executor).
+    conn = sqlite3.connect(
+        db_path,
+        isolation_level=None,
+        check_same_thread=False,
+        cached_statements=CACHED_STATEMENTS,
+    )
+    for pragma in pragmas:
+        conn.execute(pragma)
+    return conn
+
+
+def _migrate_received_at_us(db: sqlite3.Connection) -> None:
+    columns = {row[1] for row in db.execute("PRAGMA table_info(events)")}
+    if "received_at_us" not in columns:
+        db.execute("ALTER TABLE events ADD COLUMN received_at_us INTEGER")
+        db.execute(BACKFILL_RECEIVED_AT_US_SQL)
+    db.executescript(TIME_INDEX_SQL)
+
+
+def _create_fts(db: sqlite3.Connection) -> bool:
+    """Create the path FTS index; returns False when SQLite can't provide it."""
+    existed = db.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'events_fts'"
+    ).fetchone() is not None
+    try:
+        db.executescript(FTS_SQL)
+    except sqlite3.OperationalError:
+        # SQLite built without FTS5 or the trigram tokenizer (< 3.34): keep using LIKE
+        return False
+    if not existed:
+        # Index events stored before the FTS table existed
+        db.execute("INSERT INTO events_fts(events_fts) VALUES ('rebuild')")
+    return True
+
+
+def _setup_schema(db: sqlite3.Connection) -> bool:
+    db.executescript(CREATE_SQL)
+    _migrate_received_at_us(db)
+    fts = _create_fts(db)
+    # Refresh planner statistics; analysis_limit keeps this cheap on big tables.
+    db.execute("PRAGMA analysis_limit=1000")
+    db.execute("ANALYZE")
+    return fts
+
+
+def _pack_body(body: Optional[str]) -> Any:
+    if body is None or len(body) < BODY_COMPRESS_MIN:
+        return body
+    raw = body.encode("utf-8")
+    packed = zlib.compress(raw, BODY_COMPRESS_LEVEL)
+    if len(packed) + 1 >= len(raw):
+        return body
+    return bytes((BODY_CODEC_ZLIB,)) + packed
+
+
+def _unpack_body(body: Any) -> Optional[str]:
+    if not isinstance(body, bytes):
+        return body
+    if body[:1] == bytes((BODY_CODEC_ZLIB,)):
+        return zlib.decompress(body[1:]).decode("utf-8")
+    raise ValueError(f"unknown body codec {body[:1]!r}")
+
+
+def _pack_row(row: Tuple[Any, ...]) -> Tuple[Any, ...]:
+    body_text, body_b64 = row[_ROW_BODY_TEXT], row[_ROW_BODY_B64]
+    packed_text, packed_b64 = _pack_body(body_text), _pack_body(body_b64)
+    if packed_text is body_text and packed_b64 is body_b64:
+        return row
+    return (*row[:_ROW_BODY_TEXT], packed_text, packed_b64, *row[_ROW_BODY_B64 + 1:])
+
+
+def _insert_batch(db: sqlite3.Connection, rows: List[Tuple[Any, ...]]) -> int:
+    """Insert rows in one transaction and return the last new id."""
+    # Compress large bodies here, on the writer thread, rather than on the
+    # event loop; fewer, denser pages make every later scan cheaper.
+    rows = [_pack_row(row) for row in rows]
+    # BEGIN IMMEDIATE takes the write lock up front, so the batch can't
+    # fail halfway with SQLITE_BUSY when upgrading from a read lock.
+    db.execute("BEGIN IMMEDIATE")
+    try:
+        db.executemany(INSERT_SQL, rows)
+        (last_id,) = db.execute("SELECT last_insert_rowid()").fetchone()
+        db.execute("COMMIT")
+    except Exception:
+        db.execute("ROLLBACK")
+        raise
+    return int(last_id)
+
+
+def _delete_older_than(db: sqlite3.Connection, days: int) -> Tuple[int, int]:
+    """Delete old events; returns (deleted count, lowest id kept)."""
+    # Everything below the lowest id still inside the window is deleted, so
+    # the delete is a contiguous rowid range instead of a text comparison per
+    # row. received_at isn't guaranteed to rise with id (clock steps, caller
+    # supplied timestamps), so the boundary is MIN(id) over the kept rows;
+    # an older row stamped after a newer one just survives until a later run.
+    cutoff_us = int((time.time() - days * 86400) * 1_000_000)
+    row = db.execute(
+        "SELECT MIN(id) FROM events WHERE received_at_us >= ?", (cutoff_us,)
+    ).fetchone()
+    if row[0] is None:
+        row = db.execute("SELECT COALESCE(MAX(id), 0) + 1 FROM events").fetchone()
+    cur = db.execute("DELETE FROM events WHERE id < ?", (row[0],))
+    deleted = cur.rowcount if cur.rowcount else 0
+    if deleted:
+        # Move the freed pages to the end of the file and truncate them, so
+        # the file shrinks without a full VACUUM rewrite. A no-op on databases
+        # created before auto_vacuum was enabled. It frees one page per step,
+        # and only executescript steps a statement to completion.
+        db.executescript("PRAGMA incremental_vacuum;")
+    return deleted, row[0]
+
+
+def _fetch_rows(db: sqlite3.Connection, sql: str, params: Sequence[Any]) -> List[Tuple[Any, ...]]:
+    return db.execute(sql, params).fetchall()
+
+
+def _max_id(db: sqlite3.Connection) -> int:
+    return db.execute("SELECT COALESCE(MAX(id), 0) FROM events").fetchone()[0]
+
+
+def _count_client_ips(db: sqlite3.Connection) -> int:
+    row = db.execute(
+        "SELECT COUNT(DISTINCT client_ip) FROM events WHERE client_ip != ''"
+    ).fetchone()
+    return row[0] if row else 0
+
 
 class EventStore:
-    def __init__(self, db_path: str):
+    """SQLite-backed event store.
+
+    Inserts are funnelled through a single background writer task that drains
+    the pending queue in batches and commits once per batch, so a burst of
+    callbacks costs one commit instead of one per event.
+
+    Connections are plain sqlite3 driven from thread pools: `db`, the only
+    writing connection, lives on a single-thread executor that also runs
+    cleanups, so writes are serialized without locks. Queries run on a small
+    pool of read-only connections so /logs, /stats and /export proceed
+    concurrently with ingest under WAL. An in-memory database can't be shared
+    between connections, so ":memory:" stores read through `db` instead.
+    """
+
+    def __init__(
+        self,
+        db_path: str,
+        readers: int = 2,
+        recent_events: int = RECENT_EVENTS,
+        recent_bytes: int = RECENT_EVENTS_BYTES,
+    ):
         self.db_path = db_path
-        self.db: Optional[aiosqlite.Connection] = None
+        self.db: Optional[sqlite3.Connection] = None
+        self._reader_count = 0 if db_path == ":memory:" else max(0, readers)
+        self._readers: List[sqlite3.Connection] = []
+        self._idle_readers: "queue.SimpleQueue[sqlite3.Connection]" = queue.SimpleQueue()
+        self._write_pool: Optional[ThreadPoolExecutor] = None
+        self._read_pool: Optional[ThreadPoolExecutor] = None
+        self._write_queue: Optional[asyncio.Queue] = None
+        self._writer_task: Optional[asyncio.Task] = None
+        self._counters = _EventCounters()
+        self._recent = _RecentBuffer(max(0, recent_events), max(0, recent_bytes))
+        self._fts = False
+        # (last committed id, cleanups run): changes whenever any page could
+        # change, so it can validate cached reads without querying.
+        self._last_id = 0
+        self._cleanups = 0
 
     async def connect(self) -> None:
-        self.db = await aiosqlite.connect(self.db_path)
-        await self.db.execute("PRAGMA journal_mode=WAL;")
-        await self.db.execute("PRAGMA synchronous=NORMAL;")
-        await self.db.execute(CREATE_SQL)
-        await self.db.commit()
+        self._write_pool = ThreadPoolExecutor(1, thread_name_prefix="collabx-db-writer")
+        loop = asyncio.get_running_loop()
+        self.db = await loop.run_in_executor(
+            self._write_pool, _open_connection, self.db_path, CONNECTION_PRAGMAS
+        )
+        self._fts = await self._write(_setup_schema)
+        self._last_id = await self._write(_max_id)
+
+        if self._reader_count:
+            self._read_pool = ThreadPoolExecutor(
+                self._reader_count, thread_name_prefix="collabx-db-reader"
+            )
+            for _ in range(self._reader_count):
+                reader = await loop.run_in_executor(
+                    self._read_pool, _open_connection, self.db_path, READER_PRAGMAS
+                )
+                self._readers.append(reader)
+                self._idle_readers.put(reader)
+
+        # Nothing writes until the writer task starts, so the counter queries
+        # can run side by side on the readers; the slowest one sets the pace.
+        results = await asyncio.gather(*(self._read(query) for query in _COUNTER_QUERIES))
+        self._counters.apply(*results)
+
+        self._write_queue = asyncio.Queue()
+        self._writer_task = asyncio.create_task(self._writer_loop())
 
     async def close(self) -> None:
+        if self._writer_task:
+            # Let the writer finish whatever is already queued, then stop.
+            self._write_queue.put_nowait(None)
+            await self._writer_task
+            self._writer_task = None
+            self._write_queue = None
+        if self._read_pool:
+            self._read_pool.shutdown(wait=True)
+            self._read_pool = None
+        for reader in self._readers:
+            reader.close()
+        self._readers = []
+        self._idle_readers = queue.SimpleQueue()
+        if self._write_pool:
+            self._write_pool.shutdown(wait=True)
+            self._write_pool = None
         if self.db:
-            await self.db.close()
+            self.db.close()
             self.db = None
 
+    async def _write(self, fn: Callable[..., T], *args: Any) -> T:
+        """Run fn(db, *args) on the writer thread."""
+        assert self.db is not None and self._write_pool is not None, "DB not connected"
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._write_pool, functools.partial(fn, self.db, *args))
+
+    async def _read(self, fn: Callable[..., T], *args: Any) -> T:
+        """Run fn(conn, *args) on a read-only connection (the writer when there is no pool)."""
+        if self._read_pool is None:
+            return await self._write(fn, *args)
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            self._read_pool, functools.partial(self._with_reader, fn, *args)
+        )
+
+    def _with_reader(self, fn: Callable[..., T], *args: Any) -> T:
+        # One idle connection per pool thread, so this never waits.
+        conn = self._idle_readers.get()
+        try:
+            return fn(conn, *args)
+        finally:
+            self._idle_readers.put(conn)
+
     async def add_event(
         self,
         *,
@@ -66,38 +767,125 @@ class EventStore:
         body_b64: Optional[str],
         body_truncated: bool,
         content_type: str,
+        received_at_us: Optional[int] = None,
     ) -> int:
-        assert self.db is not None, "DB not connected"
-        headers_json = json.dumps(headers, ensure_ascii=False)
-        cur = await self.db.execute(
-            """
-            INSERT INTO events (
-              received_at, method, path, query,
-              client_ip, x_forwarded_for, x_real_ip,
-              origin, referer, user_agent,
-              headers_json, body_text, body_b64, body_truncated, content_type
-            ) VALUES (?,?,?,?,?,?,?,?,?,?,?,?,?,?,?)
-            """,
-            (
-                received_at,
-                method,
-                path,
-                query,
-                client_ip,
-                x_forwarded_for,
-                x_real_ip,
-                origin,
-                referer,
-                user_agent,
-                headers_json,
-                body_text,
-                body_b64,
-                1 if body_truncated else 0,
-                content_type,
-            ),
+        """Queue one event for the next batch and return its new ID.
+        
+        Args:
+            received_at_us: Epoch microseconds matching `received_at`, when the
+                caller already has them; otherwise `received_at` is parsed
+        """
+        assert self.db is not None and self._write_queue is not None, "DB not connected"
+        headers_json = orjson.dumps(headers)
+        row = (
+            received_at,
+            method,
+            path,
+            query,
+            client_ip,
+            x_forwarded_for,
+            x_real_ip,
+            origin,
+            referer,
+            user_agent,
+            headers_json,
+            body_text,
+            body_b64,
+            1 if body_truncated else 0,
+            content_type,
+            received_at_us if received_at_us is not None else _epoch_us(received_at),
         )
-        await self.db.commit()
-        return int(cur.lastrowid)
+        return await self._enqueue(row)
+
+    async def add_events(self, events: Sequence[Dict[str, Any]]) -> List[int]:
+        """Insert several events, committed together with any concurrent inserts.
+        
+        Args:
+            events: Event dictionaries with the same keys as add_event's arguments
+            
+        Returns:
+            The new event IDs, in the same order as `events`
+        """
+        assert self.db is not None and self._write_queue is not None, "DB not connected"
+        rows = [
+            (
+                e["received_at"],
+                e["method"],
+                e["path"],
+                e["query"],
+                e["client_ip"],
+                e["x_forwarded_for"],
+                e["x_real_ip"],
+                e["origin"],
+                e["referer"],
+                e["user_agent"],
+                orjson.dumps(e["headers"]),
+                e["body_text"],
+                e["body_b64"],
+                1 if e["body_truncated"] else 0,
+                e["content_type"],
+                e["received_at_us"] if e.get("received_at_us") is not None else _epoch_us(e["received_at"]),
+            )
+            for e in events
+        ]
+        return list(await asyncio.gather(*(self._enqueue(row) for row in rows)))
+
+    def _enqueue(self, row: Tuple[Any, ...]) -> "asyncio.Future[int]":
+        assert self._write_queue is not None, "DB not connected"
+        fut: asyncio.Future = asyncio.get_running_loop().create_future()
+        self._write_queue.put_nowait((row, fut))
+        return fut
+
+    async def _writer_loop(self) -> None:
+        assert self._write_queue is not None
+        queue = self._write_queue
+        stopping = False
+        while not stopping:
+            item = await queue.get()
+            if item is None:
+                break
+            # Give concurrent requests one loop turn to enqueue before sizing the batch.
+            await asyncio.sleep(0)
+            batch = [item]
+            limit = min(MAX_BATCH, max(MIN_BATCH, queue.qsize() // 2))
+            while len(batch) < limit and not queue.empty():
+                nxt = queue.get_nowait()
+                if nxt is None:
+                    stopping = True
+                    break
+                batch.append(nxt)
+
+            try:
+                ids = await self._insert_batch([row for row, _ in batch])
+            except Exception as exc:
+                for _, fut in batch:
+                    if not fut.done():
+                        fut.set_exception(exc)
+                continue
+            for (_, fut), event_id in zip(batch, ids):
+                if not fut.done():
+                    fut.set_result(event_id)
+
+    async def _insert_batch(self, rows: List[Tuple[Any, ...]]) -> List[int]:
+        last_id = await self._write(self._insert_and_record, rows)
+        self._last_id = max(self._last_id, last_id)
+        # Only the writer thread inserts, so the batch occupies a contiguous
+        # id range ending at the connection's last_insert_rowid().
+        first_id = last_id - len(rows) + 1
+        self._recent.extend(first_id, rows)
+        return list(range(first_id, first_id + len(rows)))
+
+    def _insert_and_record(self, db: sqlite3.Connection, rows: List[Tuple[Any, ...]]) -> int:
+        # Runs on the writer thread: the counters see this batch in the same
+        # order as the table does, relative to any cleanup's reload.
+        last_id = _insert_batch(db, rows)
+        self._counters.record(rows)
+        return last_id
+
+    @property
+    def version(self) -> Tuple[int, int]:
+        """Changes whenever events are added or deleted; equal versions mean equal pages."""
+        return self._last_id, self._cleanups
 
     async def get_events(
         self,
@@ -117,87 +905,121 @@ class EventStore:
         Returns:
             Tuple of (events list, last_id)
         """
+        rows, last_id = await self._page_rows(after_id, limit, method, path_contains)
+        return _rows_to_events(rows), last_id
+
+    async def get_events_json(
+        self,
+        after_id: int,
+        limit: int,
+        method: Optional[str] = None,
+        path_contains: Optional[str] = None,
+    ) -> Tuple[bytes, int, int]:
+        """Like get_events, but return the events already encoded as a JSON array.
+        
+        Stored headers are spliced into the output as-is instead of being
+        parsed into dicts only to be serialized again.
+        
+        Args:
+            after_id: Return events with ID > this value
+            limit: Maximum number of events to return
+            method: Optional filter by HTTP method
+            path_contains: Optional filter for paths containing this string
+            
+        Returns:
+            Tuple of (JSON array bytes, last_id, event count)
+        """
+        rows, last_id = await self._page_rows(after_id, limit, method, path_contains)
+        return _rows_to_json_array(rows), last_id, len(rows)
+
+    async def _page_rows(
+        self,
+        after_id: int,
+        limit: int,
+        method: Optional[str],
+        path_contains: Optional[str],
+    ) -> Tuple[List[Tuple[Any, ...]], int]:
         assert self.db is not None, "DB not connected"
         limit = max(1, min(limit, 200))
         after_id = max(0, int(after_id))
 
-        # Build query with optional filters
-        conditions = ["id > ?"]
-        params = [after_id]
+        if not method and not path_contains and self._recent.covers(after_id):
+            # The newest events are all in memory; skip SQLite entirely.
+            rows = self._recent.rows_after(after_id, limit)
+        else:
+            # A page is at most 200 rows: one keyset query, same SQL as exports.
+            sql, params = _event_query(after_id, method, path_contains, self._fts)
+            rows = await self._read(_fetch_rows, sql, (*params, limit))
+        last_id = rows[-1][0] if rows else after_id
+        return rows, last_id
+
+    async def iter_events(
+        self,
+        after_id: int,
+        limit: int,
+        method: Optional[str] = None,
+        path_contains: Optional[str] = None,
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """Yield events one at a time, fetched in small keyset-paged chunks.
         
-        if method:
-            conditions.append("method = ?")
-            params.append(method.upper())
+        Unlike get_events, rows are never held as a full list, so large
+        exports stay flat in memory.
         
-        if path_contains:
-            conditions.append("path LIKE ?")
-            params.append(f"%{path_contains}%")
+        Args:
+            after_id: Return events with ID > this value
+            limit: Maximum number of events to yield
+            method: Optional filter by HTTP method
+            path_contains: Optional filter for paths containing this string
+            
+        Yields:
+            Event dictionaries in ascending ID order
+        """
+        assert self.db is not None, "DB not connected"
+        limit = max(1, int(limit))
+        after_id = max(0, int(after_id))
+
+        sql, params = _event_query(after_id, method, path_contains, self._fts)
+        # Keyset paging: each chunk is its own short query continuing after the
+        # last id seen, so no cursor or connection is held between chunks.
+        remaining = limit
+        while remaining > 0:
+            rows = await self._read(_fetch_rows, sql, (*params, min(remaining, 200)))
+            if not rows:
+                break
+            for event in _rows_to_events(rows):
+                yield event
+            remaining -= len(rows)
+            params[0] = rows[-1][0]
+    
+    async def iter_rows(
+        self, after_id: int, limit: int, columns: Tuple[str, ...]
+    ) -> AsyncIterator[Tuple[Any, ...]]:
+        """Yield raw row tuples of just `columns`, in ascending ID order.
         
-        where_clause = " AND ".join(conditions)
+        For exports that only need flat columns: no dict is built per row and
+        unselected columns (bodies, headers) are never decoded.
         
-        cur = await self.db.execute(
-            f"""
-            SELECT
-              id, received_at, method, path, query,
-              client_ip, x_forwarded_for, x_real_ip,
-              origin, referer, user_agent,
-              headers_json, body_text, body_b64, body_truncated, content_type
-            FROM events
-            WHERE {where_clause}
-            ORDER BY id ASC
-            LIMIT ?
-            """,
-            (*params, limit),
-        )
-        rows = await cur.fetchall()
+        Args:
+            after_id: Return events with ID > this value
+            limit: Maximum number of rows to yield
+            columns: Table column names to select; the first must be "id"
+            
+        Yields:
+            One tuple per event, values in `columns` order
+        """
+        assert self.db is not None, "DB not connected"
+        limit = max(1, int(limit))
+        sql = _select_rows_sql(tuple(columns))
 
-        events: List[Dict[str, Any]] = []
-        last_id = after_id
-        for r in rows:
-            (
-                eid,
-                received_at,
-                method_val,
-                path,
-                query,
-                client_ip,
-                x_forwarded_for,
-                x_real_ip,
-                origin,
-                referer,
-                user_agent,
-                headers_json,
-                body_text,
-                body_b64,
-                body_truncated,
-                content_type,
-            ) = r
-            last_id = int(eid)
-            try:
-                headers = json.loads(headers_json) if headers_json else {}
-            except json.JSONDecodeError:
-                headers = {}
-            events.append(
-                dict(
-                    id=int(eid),
-                    received_at=received_at,
-                    method=method_val,
-                    path=path,
-                    query=query,
-                    client_ip=client_ip,
-                    x_forwarded_for=x_forwarded_for,
-                    x_real_ip=x_real_ip,
-                    origin=origin,
-                    referer=referer,
-                    user_agent=user_agent,
-                    headers=headers,
-                    body_text=body_text,
-                    body_b64=body_b64,
-                    body_truncated=bool(body_truncated),
-                    content_type=content_type,
-                )
-            )
-        return events, last_id
+        remaining = limit
+        while remaining > 0:
+            rows = await self._read(_fetch_rows, sql, (after_id, min(remaining, 200)))
+            if not rows:
+                break
+            for row in rows:
+                yield row
+            remaining -= len(rows)
+            after_id = rows[-1][0]
     
     async def get_statistics(self) -> Dict[str, Any]:
         """Get collection statistics.
@@ -207,49 +1029,18 @@ class EventStore:
         """
         assert self.db is not None, "DB not connected"
         
-        # Total count
-        cur = await self.db.execute("SELECT COUNT(*) FROM events")
-        row = await cur.fetchone()
-        total_count = row[0] if row else 0
-        
-        # Count by method
-        cur = await self.db.execute(
-            "SELECT method, COUNT(*) as count FROM events GROUP BY method ORDER BY count DESC"
-        )
-        rows = await cur.fetchall()
-        by_method = {method: count for method, count in rows}
-        
-        # Recent events (last 24 hours)
-        cur = await self.db.execute(
-            "SELECT COUNT(*) FROM events WHERE received_at > datetime('now', '-1 day')"
-        )
-        row = await cur.fetchone()
-        last_24h = row[0] if row else 0
-        
-        # First and last event timestamps
-        cur = await self.db.execute(
-            "SELECT MIN(received_at), MAX(received_at) FROM events"
-        )
-        row = await cur.fetchone()
-        first_event = row[0] if row and row[0] else None
-        last_event = row[1] if row and row[1] else None
-        
-        # Unique IPs
-        cur = await self.db.execute(
-            "SELECT COUNT(DISTINCT client_ip) FROM events WHERE client_ip != ''"
-        )
-        row = await cur.fetchone()
-        unique_ips = row[0] if row else 0
-        
-        return {
-            "total_events": total_count,
-            "events_last_24h": last_24h,
-            "unique_ips": unique_ips,
-            "by_method": by_method,
-            "first_event": first_event,
-            "last_event": last_event,
-        }
+        stats = self._counters.snapshot()
+        if stats["unique_ips"] is None:
+            stats["unique_ips"] = await self._read(_count_client_ips)
+        return stats
     
+    def _delete_and_reload(self, db: sqlite3.Connection, days: int) -> Tuple[int, int]:
+        # One writer-thread job, so no insert batch lands between the delete
+        # and the counter reload.
+        result = _delete_older_than(db, days)
+        self._counters.load(db)
+        return result
+
     async def cleanup_old_events(self, days: int) -> int:
         """Delete events older than the specified number of days.
         
@@ -261,10 +1052,8 @@ class EventStore:
         """
         assert self.db is not None, "DB not connected"
         
-        cur = await self.db.execute(
-            "DELETE FROM events WHERE received_at < datetime('now', ? || ' days')",
-            (f"-{days}",)
-        )
-        await self.db.commit()
+        deleted, first_kept = await self._write(self._delete_and_reload, days)
+        self._recent.drop_before(first_kept)
+        self._cleanups += 1
         
-        return cur.rowcount if cur.rowcount else 0
+        return deleted
@@ -5,7 +5,16 @@ import json
 import csv
 import io
 
-from collabx_server.export import export_to_json, export_to_csv, export_to_ndjson
+from collabx_server.export import (
+    export_to_json,
+    export_to_csv,
+    export_to_ndjson,
+    export_to_ndjson_bytes,
+    iter_csv,
+    iter_ndjson,
+    stream_json,
+    stream_ndjson,
+)
 
 
 def test_export_to_json():
@@ -74,3 +83,59 @@ def test_export_to_ndjson():
     assert len(lines) == 2
     assert json.loads(lines[0])["id"] == 1
     assert json.loads(lines[1])["id"] == 2
+
+
+def test_export_to_ndjson_bytes():
+    """Test NDJSON export as bytes keeps non-ASCII text intact."""
+    events = [
+        {"id": 1, "path": "/caf\u00e9"},
+        {"id": 2, "path": "/data"},
+    ]
+    
+    result = export_to_ndjson_bytes(events)
+    assert isinstance(result, bytes)
+    
+    lines = result.split(b'\n')
+    assert len(lines) == 2
+    assert json.loads(lines[0])["path"] == "/caf\u00e9"
+    assert result.decode("utf-8") == export_to_ndjson(events)
+
+
+def test_iter_csv_yields_lines():
+    """Test CSV generator yields the header and one line per event."""
+    events = ({"id": i, "method": "GET", "headers": {"a": "b"}} for i in range(3))
+    
+    chunks = list(iter_csv(events))
+    
+    assert len(chunks) == 4
+    assert chunks[0].startswith("id,received_at,method")
+    assert chunks[1].startswith("0,,GET")
+    assert list(iter_csv([])) == []
+
+
+def test_iter_ndjson_matches_export():
+    """Test NDJSON generator output joins to the same bytes as the exporter."""
+    events = [{"id": 1}, {"id": 2}, {"id": 3}]
+    
+    assert b"".join(iter_ndjson(events)) == export_to_ndjson_bytes(events)
+
+
+async def _aiter(items):
+    for item in items:
+        yield item
+
+
+async def _collect(chunks):
+    return b"".join([chunk async for chunk in chunks])
+
+
+async def test_streaming_exports_match_buffered_output():
+    """Test streamed exports are byte-identical to the buffered helpers."""
+    events = [
+        {"id": 1, "method": "GET", "path": "/a", "headers": {"x": "1"}, "body_text": "line\nbreak"},
+        {"id": 2, "method": "POST", "path": "/b", "headers": {}, "body_text": None},
+    ]
+    
+    for batch in (events, []):
+        assert await _collect(stream_json(_aiter(batch))) == export_to_json(batch).encode()
+        assert await _collect(stream_ndjson(_aiter(batch))) == export_to_ndjson_bytes(batch)
@@ -23,6 +23,13 @@ def client(test_app):
     return TestClient(test_app)
 
 
+@pytest.fixture
+def live_client(test_app):
+    """Create test client with the app's startup/shutdown hooks run."""
+    with TestClient(test_app) as c:
+        yield c
+
+
 def test_healthz(client):
     """Test health check endpoint."""
     response = client.get("/healthz")
@@ -188,3 +195,72 @@ def test_pagination(client):
     assert response.status_code == 200
     data2 = response.json()
     assert len(data2["events"]) <= 5
+
+
+def test_logs_etag_not_modified(live_client):
+    """Test /logs answers a repeated idle poll with 304 until new events arrive."""
+    url = "/test_token_12345678/logs?limit=50&after_id=0"
+    live_client.get("/test_token_12345678/c")
+
+    first = live_client.get(url)
+    etag = first.headers["etag"]
+    assert first.status_code == 200 and etag.startswith('W/"')
+
+    repeat = live_client.get(url, headers={"If-None-Match": etag})
+    assert repeat.status_code == 304
+    assert repeat.content == b""
+
+    # A different cursor or filter is a different page
+    assert live_client.get(url + "&method=POST", headers={"If-None-Match": etag}).status_code == 200
+
+    live_client.get("/test_token_12345678/c")
+    changed = live_client.get(url, headers={"If-None-Match": etag})
+    assert changed.status_code == 200
+    assert changed.json()["count"] == 2
+    assert changed.headers["etag"] != etag
+
+
+def test_body_capped_at_max_body_bytes(monkeypatch):
+    """Test oversized bodies are stored cut to max_body_bytes and flagged truncated."""
+    monkeypatch.setenv("COLLABX_TOKEN", "test_token_12345678")
+    monkeypatch.setenv("COLLABX_DB_PATH", ":memory:")
+    monkeypatch.setenv("COLLABX_MAX_BODY_BYTES", "1024")
+
+    with TestClient(create_app()) as client:
+        # Several chunks, so the cap is hit partway through the stream
+        chunks = [b"a" * 700, b"b" * 700, b"c" * 700]
+        assert client.post("/test_token_12345678/c", content=iter(chunks)).status_code == 200
+        assert client.post("/test_token_12345678/c", content=b"d" * 1024).status_code == 200
+
+        over, exact = client.get("/test_token_12345678/logs").json()["events"]
+
+    assert over["body_text"] == "a" * 700 + "b" * 324
+    assert over["body_truncated"] is True
+    assert exact["body_text"] == "d" * 1024
+    assert exact["body_truncated"] is False
+
+
+def test_logs_etag_does_not_echo_filters(live_client):
+    """Test filter values never reach the ETag header verbatim."""
+    for method in ("%E2%9C%93", "a%22b", "GET%0D%0AX-Injected:%201"):
+        response = live_client.get(f"/test_token_12345678/logs?method={method}")
+        assert response.status_code == 200
+        etag = response.headers["etag"]
+        assert etag.startswith('W/"') and etag.count('"') == 2
+        assert "x-injected" not in response.headers
+
+
+def test_stats_and_collector_responses_raise_no_deprecation_warnings(live_client):
+    """Test the orjson-rendered responses don't go through deprecated FastAPI classes."""
+    import warnings
+
+    from fastapi.exceptions import FastAPIDeprecationWarning
+
+    with warnings.catch_warnings():
+        warnings.simplefilter("error", FastAPIDeprecationWarning)
+        collected = live_client.post("/test_token_12345678/c", content=b"x")
+        stats = live_client.get("/test_token_12345678/stats")
+
+    assert collected.json()["ok"] is True
+    assert stats.headers["content-type"] == "application/json"
+    assert stats.json()["by_method"] == {"POST": 1}
@@ -0,0 +1,50 @@
+"""Tests for middleware components."""
+from __future__ import annotations
+
+from starlette.applications import Starlette
+from starlette.responses import PlainTextResponse
+from starlette.routing import Route
+from starlette.testclient import TestClient
+
+from collabx_server.middleware import RateLimitMiddleware
+
+
+def _client(requests_per_minute: int, **kwargs) -> TestClient:
+    async def ok(request):
+        return PlainTextResponse("ok")
+
+    app = Starlette(routes=[Route("/c", ok), Route("/healthz", ok)])
+    app.add_middleware(RateLimitMiddleware, requests_per_minute=requests_per_minute, **kwargs)
+    return TestClient(app)
+
+
+def test_rate_limit_rejects_over_limit():
+    """Test requests beyond the per-minute limit get a 429."""
+    client = _client(requests_per_minute=3)
+    
+    codes = [client.get("/c").status_code for _ in range(4)]
+    
+    assert codes == [200, 200, 200, 429]
+    assert "Too many requests" in client.get("/c").json()["detail"]
+
+
+def test_rate_limit_per_forwarded_ip_and_healthz_exempt():
+    """Test limits are tracked per X-Forwarded-For client and /healthz is exempt."""
+    client = _client(requests_per_minute=1)
+    
+    assert client.get("/c", headers={"X-Forwarded-For": "1.1.1.1"}).status_code == 200
+    assert client.get("/c", headers={"X-Forwarded-For": "1.1.1.1"}).status_code == 429
+    assert client.get("/c", headers={"X-Forwarded-For": "2.2.2.2, 10.0.0.1"}).status_code == 200
+    assert all(client.get("/healthz").status_code == 200 for _ in range(3))
+
+
+def test_rate_limit_tracks_bounded_number_of_ips():
+    """Test the least recently seen IP is evicted once max_clients is reached."""
+    client = _client(requests_per_minute=1, max_clients=2)
+    
+    for ip in ("1.1.1.1", "2.2.2.2", "3.3.3.3"):
+        assert client.get("/c", headers={"X-Forwarded-For": ip}).status_code == 200
+    
+    # 1.1.1.1 was evicted, so its window starts over; 3.3.3.3 is still tracked
+    assert client.get("/c", headers={"X-Forwarded-For": "1.1.1.1"}).status_code == 200
+    assert client.get("/c", headers={"X-Forwarded-For": "3.3.3.3"}).status_code == 429
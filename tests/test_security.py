@@ -7,7 +7,9 @@ from fastapi import HTTPException
 from collabx_server.security import (
     verify_token_or_404,
     best_client_ip,
+    client_ip_from_headers,
     clamp_headers,
+    extract_headers,
     apply_redactions,
     decode_body_bytes,
 )
@@ -91,3 +93,73 @@ def test_decode_body_bytes_binary():
     assert text is None
     assert b64 is not None
     assert len(b64) > 0
+
+
+def test_decode_body_bytes_non_ascii_utf8():
+    """Test UTF-8 text outside ASCII is still decoded as text."""
+    text, b64 = decode_body_bytes("héllo ✓".encode("utf-8"))
+    
+    assert text == "héllo ✓"
+    assert b64 is None
+
+
+def test_decode_body_bytes_binary_base64():
+    """Test binary payloads round-trip through base64."""
+    import base64
+    
+    payload = bytes(range(256))
+    text, b64 = decode_body_bytes(bytearray(payload))
+    
+    assert text is None
+    assert base64.b64decode(b64) == payload
+
+
+def test_apply_redactions_compiled_settings_patterns():
+    """Test redaction with patterns precompiled on Settings."""
+    settings = Settings(token="t", redact_patterns=r"password=[^&]+,(unclosed,TOKEN=[^&]+")
+    
+    # Invalid patterns are dropped at compile time; matching is case-insensitive
+    assert len(settings.redact_regexes) == 2
+    assert settings.redact_regexes is settings.redact_regexes
+    
+    result = apply_redactions("password=secret123&token=abc&api_key=xyz", settings.redact_regexes)
+    assert result == "[REDACTED]&[REDACTED]&api_key=xyz"
+
+
+def test_extract_headers():
+    """Test single-pass header extraction with allowlist and byte clamp."""
+    raw = [
+        (b"host", b"example.com"),
+        (b"user-agent", b"curl/8"),
+        (b"origin", b"https://a.example"),
+        (b"referer", b"https://b.example/" + b"x" * 100),
+        (b"cookie", b"secret=1"),
+    ]
+    allow = frozenset({"user-agent", "origin", "referer"})
+    
+    headers, well_known = extract_headers(raw, allow, max_total_bytes=50)
+    
+    # referer pushes the total over the limit and is dropped
+    assert headers == {"user-agent": "curl/8", "origin": "https://a.example"}
+    assert "cookie" not in headers
+    assert well_known["referer"].startswith("https://b.example/")
+    assert well_known["user-agent"] == "curl/8"
+    assert "content-type" not in well_known
+
+
+def test_client_ip_from_extracted_headers():
+    """Test client IP selection from the single-pass well-known headers."""
+    raw = [
+        (b"X-Forwarded-For", b"203.0.113.7, 10.0.0.1"),
+        (b"x-real-ip", b"10.0.0.2"),
+        (b"cf-connecting-ip", b"198.51.100.1"),
+    ]
+    _, well_known = extract_headers(raw, frozenset(), max_total_bytes=1024)
+    
+    assert client_ip_from_headers(well_known, "127.0.0.1") == (
+        "203.0.113.7",
+        "203.0.113.7, 10.0.0.1",
+        "10.0.0.2",
+    )
+    assert client_ip_from_headers({"true-client-ip": " 192.0.2.9 "}, "127.0.0.1")[0] == "192.0.2.9"
+    assert client_ip_from_headers({}, "127.0.0.1") == ("127.0.0.1", "", "")
@@ -0,0 +1,50 @@
+"""Tests for the SSE broadcaster."""
+from __future__ import annotations
+
+import asyncio
+
+from collabx_server.sse import SSEBroadcaster
+
+
+async def test_wait_for_items_times_out_empty():
+    """Test an idle wait returns no items instead of raising."""
+    broadcaster = SSEBroadcaster()
+    cursor = broadcaster.subscribe()
+    
+    items, new_cursor = await broadcaster.wait_for_items(cursor, timeout=0.01)
+    
+    assert items == []
+    assert new_cursor == cursor
+
+
+async def test_wait_for_items_wakes_on_publish():
+    """Test subscribers wake up and receive everything published since their cursor."""
+    broadcaster = SSEBroadcaster()
+    cursors = [broadcaster.subscribe(), broadcaster.subscribe()]
+    assert broadcaster.subscriber_count == 2
+    
+    async def publish():
+        await asyncio.sleep(0.01)
+        broadcaster.publish_nowait({"id": 1})
+        broadcaster.publish_nowait({"id": 2})
+    
+    results = await asyncio.gather(
+        *(broadcaster.wait_for_items(c, timeout=1.0) for c in cursors),
+        publish(),
+    )
+    
+    for items, cursor in results[:2]:
+        assert [e["id"] for e in items] == [1, 2]
+        assert cursor == 2
+
+
+async def test_slow_subscriber_drops_oldest():
+    """Test a subscriber that falls behind only sees the newest buffered items."""
+    broadcaster = SSEBroadcaster(buffer_size=3)
+    cursor = broadcaster.subscribe()
+    for i in range(5):
+        broadcaster.publish_nowait(i)
+    
+    items, _ = await broadcaster.wait_for_items(cursor, timeout=0.01)
+    
+    assert items == [2, 3, 4]
@@ -0,0 +1,34 @@
+"""Tests for CLI target state persistence."""
+from __future__ import annotations
+
+import threading
+
+from collabx.state import TargetState, load_state, save_state
+
+
+def test_concurrent_saves_never_expose_a_partial_file(tmp_path):
+    """Test readers racing writers always see a complete state, never 'no target'."""
+    path = tmp_path / "state.json"
+    save_state(TargetState(base_url="http://a", token="t0", provider="gcp"), path)
+    stop = threading.Event()
+
+    def writer(n):
+        i = 0
+        while not stop.is_set():
+            resources = {"service": f"svc-{n}-{i}", "pad": "x" * 4096}
+            save_state(TargetState(base_url="http://a", token=f"t{n}", provider="gcp", resources=resources), path)
+            i += 1
+
+    threads = [threading.Thread(target=writer, args=(n,)) for n in range(2)]
+    for t in threads:
+        t.start()
+    try:
+        for _ in range(500):
+            state = load_state(path)
+            assert state is not None and state.provider == "gcp"
+    finally:
+        stop.set()
+        for t in threads:
+            t.join()
+
+    assert [p.name for p in tmp_path.iterdir()] == ["state.json"]
@@ -0,0 +1,447 @@
+"""Tests for the SQLite event store."""
+from __future__ import annotations
+
+import asyncio
+import os
+import time
+from datetime import datetime, timezone
+
+import orjson
+
+from collabx_server.storage import EventStore
+
+
+def _event(**overrides):
+    event = dict(
+        received_at="2024-01-01T00:00:00+00:00",
+        method="POST",
+        path="/c/token",
+        query="",
+        client_ip="127.0.0.1",
+        x_forwarded_for="",
+        x_real_ip="",
+        origin="",
+        referer="",
+        user_agent="pytest",
+        headers={"content-type": "text/plain"},
+        body_text="hello",
+        body_b64=None,
+        body_truncated=False,
+        content_type="text/plain",
+    )
+    event.update(overrides)
+    return event
+
+
+async def test_concurrent_add_event_returns_distinct_ids():
+    """Test a burst of inserts is batched and every caller gets its own id."""
+    store = EventStore(":memory:")
+    await store.connect()
+    try:
+        ids = await asyncio.gather(
+            *(store.add_event(**_event(body_text=str(i))) for i in range(50))
+        )
+
+        assert sorted(ids) == list(range(1, 51))
+
+        events, last_id = await store.get_events(after_id=ids[7] - 1, limit=1)
+        assert last_id == ids[7]
+        assert events[0]["body_text"] == "7"
+    finally:
+        await store.close()
+
+
+async def test_close_flushes_pending_inserts():
+    """Test inserts queued before close still get written."""
+    store = EventStore(":memory:")
+    await store.connect()
+    pending = asyncio.ensure_future(store.add_event(**_event()))
+    await asyncio.sleep(0)
+
+    await store.close()
+
+    assert await pending == 1
+
+
+async def test_add_events_returns_ids_in_order():
+    """Test the bulk insert path assigns consecutive ids in input order."""
+    store = EventStore(":memory:")
+    await store.connect()
+    try:
+        first = await store.add_event(**_event())
+        ids = await store.add_events([_event(method=m) for m in ("GET", "PUT", "DELETE")])
+
+        assert ids == [first + 1, first + 2, first + 3]
+        events, _ = await store.get_events(after_id=first, limit=10)
+        assert [e["method"] for e in events] == ["GET", "PUT", "DELETE"]
+    finally:
+        await store.close()
+
+
+async def test_file_store_reads_through_reader_pool(tmp_path):
+    """Test committed inserts are visible to the read-only connections."""
+    store = EventStore(str(tmp_path / "events.sqlite3"), readers=2)
+    await store.connect()
+    try:
+        event_id = await store.add_event(**_event())
+
+        events, last_id = await store.get_events(after_id=0, limit=10)
+        stats = await store.get_statistics()
+        exported = [e async for e in store.iter_events(after_id=0, limit=10)]
+
+        assert last_id == event_id
+        assert [e["id"] for e in events] == [e["id"] for e in exported] == [event_id]
+        assert stats["total_events"] == 1
+    finally:
+        await store.close()
+
+
+async def test_statistics_track_inserts_and_cleanup():
+    """Test the incremental counters agree with the table across inserts and cleanup."""
+    store = EventStore(":memory:")
+    await store.connect()
+    try:
+        await store.add_event(**_event(received_at="2000-01-01T00:00:00.000000+00:00"))
+        await store.add_events(
+            [
+                _event(received_at=utc_now, method=m, client_ip=ip)
+                for utc_now, m, ip in (
+                    ("2999-01-01T00:00:00.000000+00:00", "GET", "10.0.0.1"),
+                    ("2999-01-01T00:00:01.000000+00:00", "GET", "10.0.0.2"),
+                    ("2999-01-01T00:00:02.000000+00:00", "POST", ""),
+                )
+            ]
+        )
+
+        stats = await store.get_statistics()
+        assert stats["total_events"] == 4
+        assert stats["by_method"] == {"GET": 2, "POST": 2}
+        assert stats["unique_ips"] == 3
+        # The year-2000 event is outside the window; future-dated ones count
+        assert stats["events_last_24h"] == 3
+        assert stats["first_event"] == "2000-01-01T00:00:00.000000+00:00"
+        assert stats["last_event"] == "2999-01-01T00:00:02.000000+00:00"
+
+        assert await store.cleanup_old_events(days=30) == 1
+        stats = await store.get_statistics()
+        assert stats["total_events"] == 3
+        assert stats["by_method"] == {"GET": 2, "POST": 1}
+        assert stats["first_event"] == "2999-01-01T00:00:00.000000+00:00"
+    finally:
+        await store.close()
+
+
+async def test_path_contains_filter():
+    """Test substring path filtering through the FTS index and the short-string LIKE fallback."""
+    store = EventStore(":memory:")
+    await store.connect()
+    try:
+        await store.add_events(
+            [_event(path=p) for p in ("/t/c/Alpha/x", "/t/c/beta", "/t/c/alphabet", '/t/c/"q"')]
+        )
+
+        async def paths(needle):
+            events, _ = await store.get_events(after_id=0, limit=10, path_contains=needle)
+            return [e["path"] for e in events]
+
+        assert await paths("alpha") == ["/t/c/Alpha/x", "/t/c/alphabet"]
+        assert await paths("bet") == ["/t/c/beta", "/t/c/alphabet"]
+        assert await paths("/x") == ["/t/c/Alpha/x"]
+        assert await paths('"q"') == ['/t/c/"q"']
+        assert await paths("zzz") == []
+
+        await store.cleanup_old_events(days=1)
+        await store.add_event(**_event(path="/t/c/alpha2"))
+        assert await paths("alpha") == ["/t/c/alpha2"]
+    finally:
+        await store.close()
+
+
+async def test_event_queries_use_index_seeks_without_sorting():
+    """Test every get_events filter combination seeks an index and never sorts."""
+    from collabx_server.storage import _event_query
+
+    store = EventStore(":memory:")
+    await store.connect()
+    try:
+        for method in (None, "GET"):
+            for path_contains in (None, "ab", "abc"):
+                sql, params = _event_query(0, method, path_contains, fts=True)
+                cur = store.db.execute(f"EXPLAIN QUERY PLAN {sql}", (*params, 50))
+                steps = [row[-1] for row in cur.fetchall()]
+                plan = " | ".join(steps)
+
+                assert "TEMP B-TREE" not in plan, plan
+                # events is always reached by a seek, never a full scan
+                expected = "USING INDEX idx_events_method_id" if method else "USING INTEGER PRIMARY KEY"
+                assert steps[0].startswith(f"SEARCH events {expected}"), plan
+                if path_contains == "abc":
+                    assert "SCAN events_fts VIRTUAL TABLE" in plan, plan
+    finally:
+        await store.close()
+
+
+async def test_get_events_tolerates_damaged_header_json():
+    """Test one unparsable headers row doesn't break the rest of the page."""
+    # No in-memory buffer, so the page is read back from the patched table
+    store = EventStore(":memory:", recent_events=0)
+    await store.connect()
+    try:
+        ids = await store.add_events([_event(headers={"n": str(i)}) for i in range(3)])
+        store.db.execute("UPDATE events SET headers_json = '1,2' WHERE id = ?", (ids[1],))
+
+        events, _ = await store.get_events(after_id=0, limit=10)
+
+        assert [e["headers"] for e in events] == [{"n": "0"}, {}, {"n": "2"}]
+    finally:
+        await store.close()
+
+
+async def test_recent_buffer_matches_sqlite_pages():
+    """Test unfiltered pages served from memory match the table, across trims and cleanup."""
+    buffered = EventStore(":memory:", recent_events=4)
+    unbuffered = EventStore(":memory:", recent_events=0)
+    await buffered.connect()
+    await unbuffered.connect()
+    try:
+        for store in (buffered, unbuffered):
+            for i in range(11):
+                await store.add_event(**_event(path=f"/t/c/{i}", headers={"n": str(i)}))
+
+        assert list(buffered._recent.ids) == [8, 9, 10, 11]
+        for after_id in (0, 6, 7, 9, 11, 12):
+            assert await buffered.get_events(after_id, limit=3) == await unbuffered.get_events(
+                after_id, limit=3
+            )
+
+        # Every test event is older than a day, so cleanup empties the buffer too
+        assert await buffered.cleanup_old_events(days=1) == 11
+        assert len(buffered._recent.ids) == 0
+        assert await buffered.get_events(9, limit=3) == ([], 9)
+    finally:
+        await buffered.close()
+        await unbuffered.close()
+
+
+async def test_csv_from_row_tuples_matches_event_csv():
+    """Test CSV streamed from projected row tuples equals CSV built from event dicts."""
+    from collabx_server.export import CSV_COLUMNS, export_to_csv, stream_csv_rows
+
+    store = EventStore(":memory:")
+    await store.connect()
+    try:
+        await store.add_events(
+            [_event(path=f'/t/c/{i},"x"', body_truncated=bool(i % 2), body_text=None) for i in range(450)]
+        )
+
+        events, _ = await store.get_events(after_id=3, limit=200)
+        rows = [r async for r in store.iter_rows(3, 200, CSV_COLUMNS)]
+        streamed = b"".join([c async for c in stream_csv_rows(_aiter(rows))])
+        assert streamed == export_to_csv(events).encode()
+
+        # Keyset paging continues across chunks and stops at the limit
+        ids = [r[0] async for r in store.iter_rows(10, 430, ("id",))]
+        assert ids == list(range(11, 441))
+    finally:
+        await store.close()
+
+
+async def _aiter(items):
+    for item in items:
+        yield item
+
+
+async def test_large_bodies_are_stored_compressed():
+    """Test big bodies round-trip through a compressed BLOB while small ones stay TEXT."""
+    store = EventStore(":memory:", recent_events=0)
+    await store.connect()
+    try:
+        big_text = '{"k": "value"}' * 200
+        big_b64 = "QUJD" * 300
+        await store.add_events(
+            [_event(body_text=big_text), _event(body_text=None, body_b64=big_b64), _event()]
+        )
+
+        events, _ = await store.get_events(after_id=0, limit=10)
+        assert [(e["body_text"], e["body_b64"]) for e in events] == [
+            (big_text, None),
+            (None, big_b64),
+            ("hello", None),
+        ]
+
+        stored = store.db.execute(
+            "SELECT typeof(body_text), typeof(body_b64), length(body_text) FROM events ORDER BY id"
+        ).fetchall()
+        assert stored[0][:2] == ("blob", "null") and stored[0][2] < len(big_text) // 4
+        assert stored[1][:2] == ("null", "blob")
+        assert stored[2][:2] == ("text", "null")
+    finally:
+        await store.close()
+
+
+async def test_cleanup_returns_free_pages_to_the_os(tmp_path):
+    """Test cleanup shrinks the database file instead of leaving a freelist behind."""
+    store = EventStore(str(tmp_path / "events.sqlite3"))
+    await store.connect()
+    try:
+        await store.add_events([_event(body_text=os.urandom(2000).hex()) for _ in range(500)])
+
+        def pages():
+            return store.db.execute(
+                "SELECT (SELECT page_count FROM pragma_page_count),"
+                " (SELECT freelist_count FROM pragma_freelist_count)"
+            ).fetchone()
+
+        before, _ = pages()
+        assert await store.cleanup_old_events(days=1) == 500
+        after, free = pages()
+
+        assert free == 0
+        assert after < before // 4
+    finally:
+        await store.close()
+
+
+async def test_reopened_store_seeds_statistics_from_table(tmp_path):
+    """Test statistics loaded at connect (through the reader pool) match the running totals."""
+    path = str(tmp_path / "events.sqlite3")
+    store = EventStore(path, readers=2)
+    await store.connect()
+    now = datetime.now(timezone.utc).isoformat()
+    await store.add_events(
+        [
+            _event(received_at=now, method=m, client_ip=ip)
+            for m, ip in (("GET", "10.0.0.1"), ("POST", "10.0.0.2"), ("GET", ""))
+        ]
+        + [_event(received_at="2000-01-01T00:00:00+00:00", method="PUT", client_ip="")]
+    )
+    before = await store.get_statistics()
+    await store.close()
+
+    store = EventStore(path, readers=2)
+    await store.connect()
+    try:
+        assert await store.get_statistics() == before
+        assert before["by_method"] == {"GET": 2, "POST": 1, "PUT": 1}
+        assert before["unique_ips"] == 2
+        assert before["events_last_24h"] == 3
+    finally:
+        await store.close()
+
+
+async def test_get_events_json_matches_get_events():
+    """Test the pre-encoded page decodes to exactly the dicts get_events returns."""
+    for recent_events in (0, 100):
+        store = EventStore(":memory:", recent_events=recent_events)
+        await store.connect()
+        try:
+            ids = await store.add_events(
+                [
+                    _event(headers={"x-n": str(i), "é": "ü"}, body_text="b" * 600 if i == 2 else "hi")
+                    for i in range(4)
+                ]
+            )
+            store.db.execute("UPDATE events SET headers_json = '1,2' WHERE id = ?", (ids[1],))
+
+            for after_id, method in ((0, None), (2, None), (0, "POST"), (4, None)):
+                events, last_id = await store.get_events(after_id, limit=3, method=method)
+                payload, json_last_id, count = await store.get_events_json(after_id, limit=3, method=method)
+
+                assert orjson.loads(payload) == events
+                assert (json_last_id, count) == (last_id, len(events))
+        finally:
+            await store.close()
+
+
+async def test_cleanup_keeps_recent_events_with_out_of_order_timestamps():
+    """Test cleanup never deletes an in-window event stored before an older one."""
+    store = EventStore(":memory:")
+    await store.connect()
+    try:
+        now = time.time()
+        stamps = [now, now - 10, now - 40 * 86400, now - 5, now - 50 * 86400]
+        ids = await store.add_events([_event(received_at=_iso(t)) for t in stamps])
+
+        assert await store.cleanup_old_events(days=30) == 0
+
+        store.db.execute("DELETE FROM events WHERE id = ?", (ids[0],))
+        store.db.execute("DELETE FROM events WHERE id = ?", (ids[1],))
+        # ids[2] is now the lowest id and outside the window
+        assert await store.cleanup_old_events(days=30) == 1
+        remaining = [r[0] for r in store.db.execute("SELECT id FROM events ORDER BY id")]
+        assert remaining == ids[3:]
+    finally:
+        await store.close()
+
+
+def _iso(ts):
+    return datetime.fromtimestamp(ts, timezone.utc).isoformat()
+
+
+async def test_statistics_match_table_under_concurrent_inserts_and_cleanup():
+    """Test batches committed around a cleanup's reload are counted exactly once."""
+    store = EventStore(":memory:")
+    await store.connect()
+    try:
+        now = time.time()
+        for _ in range(20):
+            await asyncio.gather(
+                *(
+                    store.add_events(
+                        [_event(received_at=_iso(now - 40 * 86400 * (i % 2)), method=m) for m in ("GET", "POST")]
+                    )
+                    for i in range(6)
+                ),
+                store.cleanup_old_events(days=30),
+                *(store.add_event(**_event(received_at=_iso(now))) for _ in range(3)),
+            )
+
+            stats = await store.get_statistics()
+            by_method = dict(store.db.execute("SELECT method, COUNT(*) FROM events GROUP BY method"))
+            assert stats["total_events"] == sum(by_method.values())
+            assert stats["by_method"] == by_method
+    finally:
+        await store.close()
+
+
+async def test_recent_buffer_is_bounded_by_body_bytes():
+    """Test large bodies evict older buffered rows while pages still match the table."""
+    store = EventStore(":memory:", recent_events=100, recent_bytes=64 * 1024)
+    await store.connect()
+    try:
+        ids = await store.add_events([_event(body_text=str(i) * 20_000) for i in range(10)])
+
+        recent = store._recent
+        assert recent.nbytes <= 64 * 1024
+        assert list(recent.ids) == ids[-len(recent.ids):] and 0 < len(recent.ids) < 10
+
+        events, _ = await store.get_events(after_id=0, limit=20)
+        assert [e["body_text"] for e in events] == [str(i) * 20_000 for i in range(10)]
+
+        # A single row over the budget leaves the buffer empty rather than unbounded
+        await store.add_event(**_event(body_text="x" * 100_000))
+        assert len(recent.ids) == 0 and recent.nbytes == 0
+    finally:
+        await store.close()
+
+
+async def test_received_at_us_passed_through_matches_parsed_value():
+    """Test a caller-supplied received_at_us is stored as-is and agrees with the ISO string."""
+    from collabx_server.main import utc_now_iso
+    from collabx_server.storage import _epoch_us
+
+    now_us = 1_760_000_000_123_456
+    received_at = utc_now_iso(now_us)
+    assert received_at == "2025-10-09T08:53:20.123456+00:00"
+    assert _epoch_us(received_at) == now_us
+
+    store = EventStore(":memory:")
+    await store.connect()
+    try:
+        first = await store.add_event(**_event(received_at=received_at), received_at_us=now_us)
+        second = await store.add_event(**_event(received_at=received_at))
+
+        stored = dict(store.db.execute("SELECT id, received_at_us FROM events"))
+        assert stored == {first: now_us, second: now_us}
+    finally:
+        await store.close()
@@ -0,0 +1,40 @@
+"""Tests for CLI log streaming helpers."""
+from __future__ import annotations
+
+import httpx
+
+from collabx.stream import _fetch_logs_page, _iter_sse_data
+
+
+def test_iter_sse_data_split_chunks():
+    """Test events split across chunk boundaries are reassembled."""
+    chunks = [b":ok\n\nda", b'ta: {"id": 1}\n', b"\ndata: {\"id\": 2}\n\n"]
+    
+    assert list(_iter_sse_data(chunks)) == [b'{"id": 1}', b'{"id": 2}']
+
+
+def test_iter_sse_data_crlf_and_multiline():
+    """Test CRLF line endings and multi-line data fields."""
+    chunks = [b"event: msg\r\ndata: [1,\r\ndata: 2]\r\n\r\n:keepalive\r\n\r\n"]
+    
+    assert list(_iter_sse_data(chunks)) == [b"[1,\n2]"]
+
+
+def test_fetch_logs_page_sends_etag_and_handles_304():
+    """Test the poller revalidates with If-None-Match and treats 304 as no new events."""
+    seen = []
+
+    def handler(request):
+        seen.append(request.headers.get("if-none-match"))
+        if request.headers.get("if-none-match") == 'W/"1"':
+            return httpx.Response(304, headers={"ETag": 'W/"1"'})
+        return httpx.Response(200, json={"events": [{"id": 1}], "next_after_id": 1}, headers={"ETag": 'W/"1"'})
+
+    with httpx.Client(transport=httpx.MockTransport(handler)) as client:
+        payload, etag = _fetch_logs_page(client, "http://t/logs?after_id=0", None)
+        assert payload["events"] == [{"id": 1}] and etag == 'W/"1"'
+
+        payload, etag = _fetch_logs_page(client, "http://t/logs?after_id=0", etag)
+        assert payload is None and etag == 'W/"1"'
+
+    assert seen == [None, 'W/"1"']